@@ -2,7 +2,7 @@ from functui.classes import *
 from functui.common import *
 from functui.flex import hbox_flex, flex
 from functui.nav import ROOT_HORIZONTAL, ROOT_VERTICAL, InteractibleID, NavState, DEFAULT_NAV_BINDINGS, interaction_area
-from functui.io.curses import get_input_event, draw_result, wrapper
+from functui.io.curses import CursesPresenter, get_input_event, wrapper
 
 import curses
 from dataclasses import dataclass, field
@@ -25,7 +25,8 @@ def update(input: InputEvent, res: Result, m: Model):
         res=res,
         action=action, 
         nav_tree=[],
-        mouse_position=input.mouse_position_event
+        mouse_position=input.mouse_position_event,
+        scroll_delta=input.scroll_delta,
     )
 
     if input.key_event is not None:
@@ -58,10 +59,11 @@ m = Model(
 
 
 def main(stdscr: curses.window):
+    presenter = CursesPresenter(stdscr)
     while True:
         y, x = stdscr.getmaxyx()
         res = layout_to_result(view(m), Rect(x, y))
-        draw_result(res, stdscr)
+        presenter.draw(res)
 
         key: InputEvent = get_input_event(stdscr)
         if key.key_event == 'ctrl+c':
@@ -1,7 +1,7 @@
 from functui.classes import *
 from functui.common import *
 from functui.nav import ROOT_HORIZONTAL, ROOT_VERTICAL, InteractibleID, NavState, default_nav_bindings, interaction_area
-from functui.io.curses import get_input_event, draw_result, wrapper
+from functui.io.curses import CursesPresenter, get_input_event, wrapper
 
 import curses
 from dataclasses import dataclass
@@ -24,7 +24,8 @@ def update(input: InputEvent, res: Result, m: Model):
         res=res,
         action=action, 
         nav_tree=[],
-        mouse_position=input.mouse_position_event
+        mouse_position=input.mouse_position_event,
+        scroll_delta=input.scroll_delta,
     )
 
     # Put your update code here.
@@ -47,10 +48,11 @@ m = Model(
 
 
 def main(stdscr: curses.window):
+    presenter = CursesPresenter(stdscr)
     while True:
         y, x = stdscr.getmaxyx()
         res = layout_to_result(view(m), Rect(x, y))
-        draw_result(res, stdscr)
+        presenter.draw(res)
 
         key: InputEvent = get_input_event(stdscr)
         if key.key_event == 'ctrl+c':
@@ -22,7 +22,8 @@ def update(input: InputEvent, res: Result, m: Model):
         res=res,
         action=action, 
         nav_tree=[m.button_1, m.button_2],
-        mouse_position=input.mouse_position_event
+        mouse_position=input.mouse_position_event,
+        scroll_delta=input.scroll_delta,
     )
 
 
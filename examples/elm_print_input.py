@@ -24,7 +24,8 @@ def update(input: InputEvent, res: Result, m: Model):
         res=res,
         action=action, 
         nav_tree=[],
-        mouse_position=input.mouse_position_event
+        mouse_position=input.mouse_position_event,
+        scroll_delta=input.scroll_delta,
     )
 
     if input.key_event is not None:
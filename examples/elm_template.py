@@ -23,7 +23,8 @@ def update(input: InputEvent, res: Result, m: Model):
         res=res,
         action=action, 
         nav_tree=[],
-        mouse_position=input.mouse_position_event
+        mouse_position=input.mouse_position_event,
+        scroll_delta=input.scroll_delta,
     )
 
     # Put your update code here.
@@ -16,7 +16,7 @@ from functui.flex import flex_custom, hbox_flex, vbox_flex, flex
 from functui.textfield import create_text_input_event, default_text_input_bindings
 from functui.rich_text import Justify, adaptive_text
 from functui.nav import DEFAULT_NAV_BINDINGS, h_resizable_split, interaction_area, v_scroll
-from functui.io.raw import terminal
+from functui.io.raw import terminal, RenderScheduler
 from functui.io.ansi import result_to_str
 from dataclasses import dataclass
 from enum import Enum, auto
@@ -108,7 +108,7 @@ def update(input: InputEvent, res: Result, m: Model):
         if input.key_event in DEFAULT_NAV_BINDINGS:
             action = DEFAULT_NAV_BINDINGS[input.key_event]
 
-        m.nav = m.nav.update(res, action, m.nav_tree, input.mouse_position_event)
+        m.nav = m.nav.update(res, action, m.nav_tree, input.mouse_position_event, input.scroll_delta)
 
     for index, task_id in enumerate(m.tasks_ids):
         if m.nav.is_selected(task_id):
@@ -205,16 +205,18 @@ m = Model(
 )
 
 with terminal() as term:
+    scheduler = RenderScheduler(term)
     while True:
         # render
         res = layout_to_result(view(m), term.get_terminal_size())
         term.display_result(res)
 
         # wait for input
-        event = term.block_until_input()
+        events = scheduler.wait_for_events()
 
         # update
-        if event.key_event == "ctrl+c":
+        if any(event.key_event == "ctrl+c" for event in events):
             break
-        update(event, res, m)
+        for event in events:
+            update(event, res, m)
 
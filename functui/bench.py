@@ -0,0 +1,238 @@
+"""Benchmarks for the stages of drawing a frame.
+
+Every scenario builds a layout (``view``), renders it (``layout``, see
+:func:`functui.classes.layout_to_result`), draws the result onto a
+:obj:`functui.classes.Screen` (``rasterize``) and converts the screen to
+ansi (``ansi``) and html (``html``, which draws its own screen). Each stage
+is timed separately.
+
+Run from the command line with ``functui-bench`` or ``python -m functui.bench``::
+
+    functui-bench --save baseline.json
+    # ... change something ...
+    functui-bench --baseline baseline.json
+
+When a baseline is given, stages that got slower than the threshold are
+reported and the command exits with status 1.
+"""
+import argparse
+import json
+import platform
+import sys
+from math import sin
+from statistics import median
+from time import perf_counter
+from typing import Callable, NamedTuple, Sequence
+
+from .cache import clear_all
+from .canvas import PlotXY, plot
+from .classes import Color4, Layout, Rect, Screen, StyleRule, layout_to_result
+from .common import LOREM, bold, border, border_thick, border_with_title, center, clamp_height, fg, padding, text, vbox
+from .flex import flex, hbox_flex_wrap, vbox_flex
+from .io.ansi import _render_ansi
+from .io.html import result_to_html_str
+from .nav import NavState, ROOT_HORIZONTAL, Direction, h_resizable_split, interaction_area, v_scroll
+from .rich_text import adaptive_text
+
+__all__ = [
+    'DEFAULT_THRESHOLD',
+    'SCENARIOS',
+    'STAGES',
+    'Regression',
+    'Scenario',
+    'compare',
+    'main',
+    'run_scenario',
+    'run_scenarios',
+]
+
+STAGES = ("view", "layout", "rasterize", "ansi", "html")
+"""Names of the timed stages, in the order they run."""
+
+DEFAULT_THRESHOLD = 0.2
+"""A stage is a regression if its median time grew by more than this fraction of the baseline."""
+
+_MIN_REGRESSION_MS = 0.05 # ignore differences smaller than timer noise
+
+
+class Scenario(NamedTuple):
+    name: str
+    view: Callable[[], Layout]
+    size: Rect
+
+
+#
+# scenarios
+#
+
+def _todo_view(task_count: int) -> Layout:
+    nav = NavState()
+    tasks_container = ROOT_HORIZONTAL.child(0, Direction.VERTICAL, persistent=True)
+    tasks = [
+        interaction_area(tasks_container.child(i))(
+            adaptive_text(f"Task {i}: " + LOREM[:(i * 37) % len(LOREM)])
+            | padding
+            | border
+            | clamp_height(5)
+        )
+        for i in range(task_count)
+    ]
+    return h_resizable_split(
+        ROOT_HORIZONTAL.child(1),
+        nav,
+        left=vbox(tasks)
+            | v_scroll(container_id=tasks_container, nav=nav)
+            | border_with_title(text(" [Items] ") | bold | center, border_thick),
+        right=vbox_flex([
+            adaptive_text(LOREM) | padding | border_with_title(text(" [Properties] ") | center | bold, border_thick) | flex,
+            text("New Task") | center | border,
+        ]),
+    )
+
+def _deep_borders_view(depth: int) -> Layout:
+    layout = text("center") | center
+    for i in range(depth):
+        layout = layout | (fg(Color4(i % 8)) if i % 2 else border)
+    return layout
+
+def _document_view(paragraphs: int) -> Layout:
+    return vbox([adaptive_text(f"{i}. " + LOREM * 3) | padding for i in range(paragraphs)])
+
+def _flex_view(items: int) -> Layout:
+    return hbox_flex_wrap([text(f"item {i}") | border for i in range(items)])
+
+def _plot_view(points: int) -> Layout:
+    xs = [i / points for i in range(points)]
+    return plot(
+        PlotXY(xs, [0.5 + 0.4 * sin(x * 40) for x in xs], StyleRule(fg=Color4.GREEN)),
+        PlotXY(xs, [0.5 + 0.4 * sin(x * 17) for x in xs], StyleRule(fg=Color4.RED)),
+    ) | border
+
+SCENARIOS: tuple[Scenario, ...] = (
+    Scenario("todo_10k", lambda: _todo_view(10_000), Rect(120, 40)),
+    Scenario("deep_borders", lambda: _deep_borders_view(200), Rect(120, 40)),
+    Scenario("adaptive_text_document", lambda: _document_view(500), Rect(120, 40)),
+    Scenario("flex_wrap", lambda: _flex_view(2_000), Rect(120, 40)),
+    Scenario("plot_20k_points", lambda: _plot_view(20_000), Rect(120, 40)),
+    Scenario("encode_80x24", lambda: _todo_view(100), Rect(80, 24)),
+    Scenario("encode_200x60", lambda: _todo_view(100), Rect(200, 60)),
+    Scenario("encode_400x120", lambda: _todo_view(100), Rect(400, 120)),
+)
+"""Scenarios run by default."""
+
+
+#
+# running
+#
+
+def run_scenario(scenario: Scenario, repeat: int = 5, cold: bool = False) -> dict[str, dict[str, float]]:
+    """Run a scenario repeat times.
+
+    Args:
+        cold: Clear all render caches before every run. Otherwise the first
+            run fills the caches and is not counted, like in an application
+            that draws the same view many times.
+
+    Returns:
+        The median and minimum time of every stage in milliseconds, by stage name.
+    """
+    times: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    for i in range(repeat if cold else repeat + 1):
+        if cold:
+            clear_all()
+        t0 = perf_counter()
+        layout = scenario.view()
+        t1 = perf_counter()
+        result = layout_to_result(layout, scenario.size)
+        t2 = perf_counter()
+        screen = Screen(scenario.size.width, scenario.size.height)
+        screen.apply_result(result)
+        t3 = perf_counter()
+        _render_ansi(screen)
+        t4 = perf_counter()
+        result_to_html_str(result)
+        t5 = perf_counter()
+        if not cold and i == 0:
+            continue
+        for stage, start, end in zip(STAGES, (t0, t1, t2, t3, t4), (t1, t2, t3, t4, t5)):
+            times[stage].append((end - start) * 1000)
+    return {
+        stage: {"median": median(stage_times), "min": min(stage_times)}
+        for stage, stage_times in times.items()
+    }
+
+def run_scenarios(scenarios: Sequence[Scenario] = SCENARIOS, repeat: int = 5, cold: bool = False) -> dict:
+    """Run scenarios and return a report that can be saved as json, see :func:`run_scenario`."""
+    return {
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "cold": cold,
+        "scenarios": {scenario.name: run_scenario(scenario, repeat, cold) for scenario in scenarios},
+    }
+
+
+class Regression(NamedTuple):
+    scenario: str
+    stage: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms if self.baseline_ms else float("inf")
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[Regression]:
+    """Find stages whose median time grew by more than threshold compared to the baseline report.
+
+    Scenarios and stages that are missing from either report are skipped.
+    """
+    regressions = []
+    for name, stages in current["scenarios"].items():
+        baseline_stages = baseline["scenarios"].get(name, {})
+        for stage, timing in stages.items():
+            if stage not in baseline_stages:
+                continue
+            before = baseline_stages[stage]["median"]
+            after = timing["median"]
+            if after > before * (1 + threshold) and after - before > _MIN_REGRESSION_MS:
+                regressions.append(Regression(name, stage, before, after))
+    return regressions
+
+
+def _format_report(report: dict) -> str:
+    name_width = max([len("scenario"), *map(len, report["scenarios"])])
+    lines = [f"{'scenario':<{name_width}}" + "".join(f"{stage:>11}" for stage in STAGES)]
+    for name, stages in report["scenarios"].items():
+        lines.append(f"{name:<{name_width}}" + "".join(f"{stages[stage]['median']:>9.2f}ms" for stage in STAGES))
+    return "\n".join(lines)
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="functui-bench", description="Time the stages of drawing a frame.")
+    parser.add_argument("-k", "--filter", default="", help="only run scenarios whose name contains this")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="timed runs per scenario (default: %(default)s)")
+    parser.add_argument("--cold", action="store_true", help="clear render caches before every run")
+    parser.add_argument("--json", action="store_true", help="print the report as json instead of a table")
+    parser.add_argument("--save", metavar="PATH", help="write the report as json to PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a report saved with --save")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    scenarios = [scenario for scenario in SCENARIOS if args.filter in scenario.name]
+    report = run_scenarios(scenarios, args.repeat, args.cold)
+    print(json.dumps(report, indent=2) if args.json else _format_report(report))
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as file:
+        regressions = compare(json.load(file), report, args.threshold)
+    for r in regressions:
+        print(f"regression: {r.scenario} {r.stage} {r.baseline_ms:.2f}ms -> {r.current_ms:.2f}ms ({r.ratio:.2f}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
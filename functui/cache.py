@@ -0,0 +1,433 @@
+"""Caches for render functions and other pure helpers.
+
+Every cache created with :func:`render_cache` is kept in one registry, so the
+caches of all nodes can be inspected, resized and cleared from one place.
+A cache evicts its least recently used entries once it holds more than
+``maxsize`` entries, once the total weight of its entries exceeds
+``max_weight``, or once an entry has not been used for ``max_age`` frames.
+
+Render functions cached with ``translate=True`` are rendered at the origin
+and moved into place afterwards, so moving a node (for example by
+scrolling) does not invalidate its cached result. If
+:obj:`functui.classes.Frame.defer_clipping` is set, they are also cached
+independently of how much of the node is visible.
+
+Examples:
+    >>> from functui.cache import render_cache, get_cache
+    >>> @render_cache(name="example.square", maxsize=2)
+    ... def square(n):
+    ...     return n * n
+    >>> square(3), square(3)
+    (9, 9)
+    >>> square.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+    >>> get_cache("example.square") is square
+    True
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import update_wrapper
+from time import perf_counter
+from types import MethodType
+from typing import Any, Callable, NamedTuple, Self
+
+__all__ = [
+    'DEFAULT_MAX_SIZE',
+    'CacheInfo',
+    'CacheStats',
+    'FrameProfile',
+    'MIN_SIZE_CACHE_NAME',
+    'RenderCache',
+    'RenderProfile',
+    'all_caches',
+    'clear_all',
+    'current_frame',
+    'get_cache',
+    'next_frame',
+    'profile_renders',
+    'render_cache',
+    'resize_all',
+]
+
+DEFAULT_MAX_SIZE = 512
+"""How many entries a cache created with :func:`render_cache` keeps by default."""
+
+MIN_SIZE_CACHE_NAME = "functui.classes.Layout.min_size"
+"""Name of the cache used by :obj:`functui.classes.Layout.min_size`."""
+
+_caches: dict[str, "RenderCache"] = {}
+_frame = 0
+_profile: "RenderProfile | None" = None
+_KWARGS_MARK = object()
+_UNCHANGED: Any = object()
+
+
+class CacheInfo(NamedTuple):
+    """Same fields as the ``cache_info()`` of :func:`functools.lru_cache`."""
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+def _default_weight(value) -> int:
+    # results know how many draw commands they own, everything else counts as one
+    cache_weight = getattr(value, "cache_weight", None)
+    return cache_weight() if cache_weight is not None else 1
+
+
+class RenderCache:
+    """A cached function, created with :func:`render_cache`.
+
+    Compatible with the ``cache_info``, ``cache_clear`` and ``cache_parameters``
+    methods of :func:`functools.lru_cache`. Calls with unhashable arguments
+    are not cached.
+
+    Attributes:
+        name: Name under which this cache is registered.
+        maxsize: Maximum number of entries, or ``None`` for no limit.
+        max_weight: Maximum total weight of all entries, or ``None`` for no limit.
+            The weight of a :obj:`functui.classes.Result` is the number of draw
+            commands it owns, the weight of any other value is 1.
+        max_age: Entries not used during this many frames are evicted, or ``None`` to keep them.
+            See :func:`next_frame`.
+        translate: Whether the function is a render function that is cached independently of position.
+            The function is called with the frame and box (its last two arguments)
+            moved so that the box is at the origin, and the returned
+            :obj:`functui.classes.Result` is moved back with ``Result.offset_by``.
+            Only use this for render functions whose output is relative to the box's position.
+            If the frame has ``defer_clipping`` set and the box fits on the screen,
+            the function is also called with the view box set to the whole box,
+            and the part outside of the real view box is clipped when the result is drawn.
+        evictions: How many entries were evicted since the cache was last cleared.
+    """
+    def __init__(
+        self,
+        func: Callable,
+        name: str,
+        maxsize: int | None = DEFAULT_MAX_SIZE,
+        max_weight: int | None = None,
+        max_age: int | None = None,
+        weight: Callable[[Any], int] = _default_weight,
+        translate: bool = False,
+    ):
+        update_wrapper(self, func)
+        self.name = name
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self.max_age = max_age
+        self.translate = translate
+        self._weight = weight
+        # key -> [value, weight, frame in which the entry was last used]
+        self._entries: OrderedDict[Any, list] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.currweight = 0
+
+    def __call__(self, *args, **kwargs):
+        if self.translate:
+            *rest, frame, box = args
+            position = box.position
+            clip = None
+            if (
+                frame.defer_clipping
+                and box.width <= frame.screen_rect.width
+                and box.height <= frame.screen_rect.height
+            ):
+                # render as if fully visible, so the cache key does not depend on the view box
+                clip = frame.view_box.intersect(box)
+                frame = frame.with_view_box(box)
+                if clip == box:
+                    clip = None
+            if position.x or position.y or clip is not None:
+                to_origin = -position
+                result = self._cached_call((*rest, frame.offset_by(to_origin), box.offset_by(to_origin)), kwargs)
+                return result.offset_by(position, clip)
+            args = (*rest, frame, box)
+        return self._cached_call(args, kwargs)
+
+    def _cached_call(self, args: tuple, kwargs: dict):
+        key = (*args, _KWARGS_MARK, *kwargs.items()) if kwargs else args
+        entries = self._entries
+        try:
+            entry = entries[key]
+        except KeyError:
+            pass
+        except TypeError: # unhashable arguments
+            return self.__wrapped__(*args, **kwargs)
+        else:
+            self.hits += 1
+            entries.move_to_end(key)
+            entry[2] = _frame
+            if _profile is not None:
+                _profile._stats(self.name).hits += 1
+            return entry[0]
+
+        self.misses += 1
+        if _profile is None:
+            value = self.__wrapped__(*args, **kwargs)
+        else:
+            stats = _profile._stats(self.name)
+            stats.misses += 1
+            start = perf_counter()
+            value = self.__wrapped__(*args, **kwargs)
+            stats.time += perf_counter() - start
+        weight = self._weight(value)
+        entries[key] = [value, weight, _frame]
+        self.currweight += weight
+        self._evict_over_budget()
+        return value
+
+    def __get__(self, instance, owner=None):
+        # behave like a function when used as a method
+        if instance is None:
+            return self
+        return MethodType(self, instance)
+
+    def _pop_oldest(self):
+        _, (_, weight, _) = self._entries.popitem(last=False)
+        self.currweight -= weight
+        self.evictions += 1
+        if _profile is not None:
+            _profile._stats(self.name).evictions += 1
+
+    def _evict_over_budget(self):
+        entries = self._entries
+        if self.maxsize is not None:
+            while len(entries) > self.maxsize:
+                self._pop_oldest()
+        if self.max_weight is not None:
+            while entries and self.currweight > self.max_weight:
+                self._pop_oldest()
+
+    def _evict_older_than(self, frame: int):
+        # entries are ordered by last use, so the stale ones are at the front
+        entries = self._entries
+        while entries and next(iter(entries.values()))[2] < frame:
+            self._pop_oldest()
+
+    def resize(self, maxsize: int | None = _UNCHANGED, max_weight: int | None = _UNCHANGED, max_age: int | None = _UNCHANGED):
+        """Change the budgets of this cache, evicting entries if needed.
+
+        Arguments that are not given keep their current value.
+        """
+        if maxsize is not _UNCHANGED:
+            self.maxsize = maxsize
+        if max_weight is not _UNCHANGED:
+            self.max_weight = max_weight
+        if max_age is not _UNCHANGED:
+            self.max_age = max_age
+        self._evict_over_budget()
+        if self.max_age is not None:
+            self._evict_older_than(_frame - self.max_age)
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def cache_clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.currweight = 0
+
+    def cache_parameters(self) -> dict[str, Any]:
+        return {
+            "maxsize": self.maxsize,
+            "typed": False,
+            "max_weight": self.max_weight,
+            "max_age": self.max_age,
+            "translate": self.translate,
+        }
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name!r} {self.cache_info()}>"
+
+
+def render_cache(
+    func: Callable | None = None,
+    /, *,
+    name: str | None = None,
+    maxsize: int | None = DEFAULT_MAX_SIZE,
+    max_weight: int | None = None,
+    max_age: int | None = None,
+    weight: Callable[[Any], int] = _default_weight,
+    translate: bool = False,
+):
+    """Cache a pure function, usually the render function of a node.
+
+    May be used either as ``@render_cache`` or with arguments as
+    ``@render_cache(maxsize=...)``. The cache is registered under ``name``
+    (by default the module and qualified name of the function) and may
+    later be retrieved with :func:`get_cache`. For the meaning of the
+    other arguments see :obj:`RenderCache`.
+
+    Examples:
+        >>> from functui.classes import Result, Frame, Box, Layout, Rect, min_size_constant
+        >>> from functools import partial
+        >>> @render_cache(translate=True)
+        ... def _my_node_render(char: str, frame: Frame, box: Box):
+        ...     res = Result()
+        ...     res.draw_box(frame, char, box)
+        ...     return res
+        >>> def my_node(char: str):
+        ...     return Layout(
+        ...         func=my_node,
+        ...         min_size=min_size_constant(Rect(1, 1)),
+        ...         render=partial(_my_node_render, char)
+        ...     )
+    """
+    def decorator(func: Callable) -> RenderCache:
+        cache_name = name if name is not None else f"{func.__module__}.{func.__qualname__}"
+        cache = RenderCache(func, cache_name, maxsize, max_weight, max_age, weight, translate)
+        _caches[cache_name] = cache
+        return cache
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def get_cache(name: str) -> RenderCache:
+    """Get a registered cache by name. Raises :obj:`KeyError` if there is no such cache."""
+    return _caches[name]
+
+def all_caches() -> dict[str, RenderCache]:
+    """Get all registered caches by name."""
+    return dict(_caches)
+
+def clear_all():
+    """Clear every registered cache."""
+    for cache in _caches.values():
+        cache.cache_clear()
+
+def resize_all(maxsize: int | None = _UNCHANGED, max_weight: int | None = _UNCHANGED, max_age: int | None = _UNCHANGED):
+    """Change the budgets of every registered cache, see :obj:`RenderCache.resize`."""
+    for cache in _caches.values():
+        cache.resize(maxsize, max_weight, max_age)
+
+def current_frame() -> int:
+    """Get the number of the frame currently being rendered."""
+    return _frame
+
+def next_frame():
+    """Start a new frame, evicting entries that are older than the ``max_age`` of their cache.
+
+    Called by :obj:`functui.classes.layout_to_result` every time a layout is rendered.
+    """
+    global _frame
+    _frame += 1
+    for cache in _caches.values():
+        if cache.max_age is not None:
+            cache._evict_older_than(_frame - cache.max_age)
+
+
+@dataclass
+class CacheStats:
+    """Statistics of one cache, collected by :func:`profile_renders`."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    time: float = 0
+    """Seconds spent computing missed entries, including time spent in nested cached functions."""
+
+    def __add__(self, other: Self) -> Self:
+        return self.__class__(
+            self.hits + other.hits,
+            self.misses + other.misses,
+            self.evictions + other.evictions,
+            self.time + other.time,
+        )
+
+
+@dataclass
+class FrameProfile:
+    """Statistics of every cache used during one frame, see :func:`profile_renders`.
+
+    Attributes:
+        frame: The frame number, see :func:`current_frame`.
+        caches: Statistics of every cache that was used, by cache name.
+    """
+    frame: int
+    caches: dict[str, CacheStats] = field(default_factory=dict)
+
+    @property
+    def min_size_calls(self) -> int:
+        """How many times :obj:`functui.classes.Layout.min_size` was called (excluding layouts that forward their child's min_size)."""
+        stats = self.caches.get(MIN_SIZE_CACHE_NAME, CacheStats())
+        return stats.hits + stats.misses
+
+    @property
+    def min_size_computations(self) -> int:
+        """How many times a minimum size had to be computed because it was not cached."""
+        return self.caches.get(MIN_SIZE_CACHE_NAME, CacheStats()).misses
+
+    def format_table(self) -> str:
+        """Format the statistics as a table, sorted by time spent."""
+        rows = sorted(self.caches.items(), key=lambda item: item[1].time, reverse=True)
+        width = max((len(name) for name in self.caches), default=4)
+        lines = [f"{'name':<{width}} {'hits':>8} {'misses':>8} {'evicted':>8} {'ms':>9}"]
+        for name, stats in rows:
+            lines.append(
+                f"{name:<{width}} {stats.hits:>8} {stats.misses:>8} {stats.evictions:>8} {stats.time * 1000:>9.3f}"
+            )
+        return "\n".join(lines)
+
+
+class RenderProfile:
+    """Statistics collected by :func:`profile_renders`.
+
+    Attributes:
+        frames: Statistics of every frame rendered while profiling, oldest first.
+    """
+    def __init__(self):
+        self.frames: list[FrameProfile] = []
+
+    def _stats(self, name: str) -> CacheStats:
+        if not self.frames or self.frames[-1].frame != _frame:
+            self.frames.append(FrameProfile(_frame))
+        caches = self.frames[-1].caches
+        stats = caches.get(name)
+        if stats is None:
+            stats = caches[name] = CacheStats()
+        return stats
+
+    def total(self) -> FrameProfile:
+        """Statistics of all frames added together. The frame number of the total is the last frame."""
+        out = FrameProfile(self.frames[-1].frame if self.frames else _frame)
+        for frame in self.frames:
+            for name, stats in frame.caches.items():
+                out.caches[name] = out.caches.get(name, CacheStats()) + stats
+        return out
+
+    def __enter__(self) -> Self:
+        global _profile
+        if _profile is not None:
+            raise RuntimeError("Renders are already being profiled")
+        _profile = self
+        return self
+
+    def __exit__(self, *_):
+        global _profile
+        _profile = None
+
+
+def profile_renders() -> RenderProfile:
+    """Collect per frame statistics of every registered cache while inside a ``with`` block.
+
+    Each frame (see :func:`next_frame`) gets its own :obj:`FrameProfile`
+    with hits, misses, evictions and time spent for every render function,
+    as well as the number of :obj:`functui.classes.Layout.min_size` calls.
+    Profiling is off by default and adds a small overhead to every cached call.
+
+    Examples:
+        >>> from functui.classes import layout_to_result, Rect
+        >>> from functui.common import text, border
+        >>> clear_all()
+        >>> with profile_renders() as profile:
+        ...     _ = layout_to_result(text("hi") | border, Rect(10, 3))
+        ...     _ = layout_to_result(text("hi") | border, Rect(10, 3))
+        >>> [frame.caches["functui.common._border_render"].hits for frame in profile.frames]
+        [0, 1]
+    """
+    return RenderProfile()
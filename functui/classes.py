@@ -1,11 +1,18 @@
 from dataclasses import dataclass, field
-from typing import Callable, Self, Iterable, Any, Protocol, TypeAlias, NamedTuple
+from typing import Callable, Self, Iterable, Iterator, Any, Protocol, TypeAlias, NamedTuple
 from enum import Enum, Flag, auto, IntEnum
 from abc import ABC, abstractmethod
 from functools import cached_property, partial, cache
+from array import array
+from weakref import WeakValueDictionary
 
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from time import perf_counter
+
+from .cache import render_cache, next_frame, DEFAULT_MAX_SIZE, MIN_SIZE_CACHE_NAME
+from .text_width import text_width, prefix_widths
 from .color_data import HEX_TO_XTERM256_DEFINED_COLORS
-import wcwidth
 #
 # utilities
 #
@@ -25,6 +32,8 @@ __all__ = [
     'Frame',
     'InputEvent',
     'LRU_MAX_SIZE',
+    'MIN_SIZE_CACHE_MAX_SIZE',
+    'RULE_TRANSITIONS_MAX_SIZE',
     'Layout',
     'MeasureTextFunc',
     'MinSize',
@@ -37,9 +46,11 @@ __all__ = [
     'StyleAttr',
     'StyleRule',
     'WrapperNode',
+    'apply_rule_to_style_id',
     'clamp',
     'even_divide',
     'hex',
+    'intern_style',
     'intersperse',
     'layout_to_result',
     'min_size_constant',
@@ -56,9 +67,15 @@ __all__ = [
     'rule_reverse',
     'rule_strike_through',
     'rule_underline',
+    'style_by_id',
+    'visible_children',
 ]
 
-LRU_MAX_SIZE = 512
+LRU_MAX_SIZE = DEFAULT_MAX_SIZE
+MIN_SIZE_CACHE_MAX_SIZE = 4096
+"""How many minimum sizes are remembered across frames, see :obj:`Layout.min_size`."""
+RULE_TRANSITIONS_MAX_SIZE = 4096
+"""How many results of :obj:`apply_rule_to_style_id` are remembered, the oldest are forgotten first."""
 
 
 def clamp(n, smallest, largest): return max(smallest, min(n, largest))
@@ -103,6 +120,8 @@ class Coordinate:
         return Coordinate(self.x + other.x, self.y + other.y)
     def __sub__(self, other):
         return Coordinate(self.x - other.x, self.y - other.y)
+    def __neg__(self):
+        return Coordinate(-self.x, -self.y)
 
 class Rect(NamedTuple):
     """A simple immutable rectangle defined by width and height.
@@ -489,6 +508,9 @@ class StyleRule:
 class ComputedStyle:
     """An immutable dataclass for style attributes:
 
+    Every distinct style is interned to a small integer, see :obj:`intern_style`.
+    Styles are hashed by that integer.
+
     Attributes:
         fg: Foreground
         bg: Background
@@ -498,7 +520,18 @@ class ComputedStyle:
     bg: Color = Color4.RESET
     attrs: StyleAttr = StyleAttr(0)
 
-    def apply_rule(self, rule: StyleRule):
+    @cached_property
+    def id(self) -> int:
+        """This style's id in the style table."""
+        return intern_style(self)
+
+    def __hash__(self) -> int:
+        return self.id
+
+    def apply_rule(self, rule: StyleRule) -> "ComputedStyle":
+        return _styles[apply_rule_to_style_id(self.id, rule)]
+
+    def _apply_rule_uncached(self, rule: StyleRule):
         return ComputedStyle(
             attrs=(self.attrs | rule.add_attrs) & ~rule.remove_attrs,
             fg=self.fg if rule.fg is None else rule.fg,
@@ -516,6 +549,68 @@ def rule_fg(color: Color, /):
     return StyleRule(fg=color)
 def rule_bg(color: Color, /):
     return StyleRule(bg=color)
+
+#
+# style table
+#
+
+_styles: list[ComputedStyle] = []
+_style_ids: dict[tuple[Color, Color, StyleAttr], int] = {}
+_rule_transitions: dict[tuple[int, StyleRule], int] = {}
+
+def intern_style(style: ComputedStyle) -> int:
+    """Get the small integer that identifies a style.
+
+    Equal styles always get the same id, and the default
+    style (``ComputedStyle()``) always has the id 0.
+
+    Styles are never removed from the table, because screens and caches
+    keep their ids, so it grows with every distinct style that was ever
+    used. Caches keyed by style id should be bounded, like
+    :obj:`RULE_TRANSITIONS_MAX_SIZE`. Prefer a fixed palette over
+    generating a new :obj:`Color24` every frame, for example for an
+    animated gradient.
+
+    Examples:
+        >>> from functui.classes import *
+        >>> intern_style(ComputedStyle())
+        0
+        >>> style_by_id(intern_style(ComputedStyle(fg=Color4.RED))) == ComputedStyle(fg=Color4.RED)
+        True
+    """
+    key = (style.fg, style.bg, style.attrs)
+    try:
+        return _style_ids[key]
+    except KeyError:
+        _style_ids[key] = len(_styles)
+        _styles.append(style)
+        return _style_ids[key]
+
+def style_by_id(style_id: int) -> ComputedStyle:
+    """Get an interned style by its id.
+
+    May error if the id was not returned by :obj:`intern_style`.
+    """
+    return _styles[style_id]
+
+def apply_rule_to_style_id(style_id: int, rule: StyleRule) -> int:
+    """Apply a style rule to an interned style and return the id of the new style.
+
+    The last :obj:`RULE_TRANSITIONS_MAX_SIZE` results are remembered, so
+    applying the same rule to the same style twice is usually a dictionary lookup.
+    """
+    key = (style_id, rule)
+    try:
+        return _rule_transitions[key]
+    except KeyError:
+        new_id = _styles[style_id]._apply_rule_uncached(rule).id
+        while len(_rule_transitions) >= RULE_TRANSITIONS_MAX_SIZE:
+            del _rule_transitions[next(iter(_rule_transitions))] # dicts keep insertion order
+        _rule_transitions[key] = new_id
+        return new_id
+
+intern_style(ComputedStyle())
+
 # class Style:
 
 
@@ -563,16 +658,92 @@ class DrawPixel:
     pixel: Pixel
     at: Coordinate = Coordinate(0, 0)
 
+    def offset_by(self, coordinate: Coordinate) -> Self:
+        return self.__class__(self.pixel, self.at + coordinate)
+
+    def clipped_to(self, box: Box) -> Self | None:
+        """Get this command if the pixel is inside box, otherwise None."""
+        return self if box.is_point_inside(self.at) else None
+
 @dataclass(frozen=True, eq=True)
 class DrawBox:
     fill: Pixel
     box: Box
 
+    def offset_by(self, coordinate: Coordinate) -> Self:
+        return self.__class__(self.fill, self.box.offset_by(coordinate))
+
+    def clipped_to(self, box: Box) -> Self | None:
+        """Get the part of this command inside box, or None if nothing is inside."""
+        clipped = self.box.intersect(box)
+        if clipped == self.box:
+            return self
+        if clipped.width <= 0 or clipped.height <= 0:
+            return None
+        return self.__class__(self.fill, clipped)
+
 @dataclass(frozen=True, eq=True)
 class DrawStringLine:
-    string: tuple[Pixel]
-    """All pixels are assumed to contain the same style."""
+    """A line of text drawn in a single style."""
+    text: str
+    style_id: int
+    """See :obj:`intern_style`."""
+    width: int
+    """How many cells the text takes up."""
     at: Coordinate
+    wide: bytes | None = None
+    """Is 1 for every character of text that takes up two cells and 0 otherwise.
+    Is set to None if all characters take up one cell."""
+
+    @property
+    def style(self) -> ComputedStyle:
+        return style_by_id(self.style_id)
+
+    def offset_by(self, coordinate: Coordinate) -> Self:
+        return self.__class__(self.text, self.style_id, self.width, self.at + coordinate, self.wide)
+
+    def clipped_to(self, box: Box) -> Self | None:
+        """Get the characters of this line that are fully inside box, or None if there are none.
+
+        Clips the same way as :obj:`Result.draw_string_line` clips to the view box.
+        """
+        if not (box.position.y <= self.at.y < box.position.y + box.height):
+            return None
+        left = box.position.x - self.at.x
+        right = box.position.x + box.width - self.at.x
+        if left <= 0 and right >= self.width:
+            return self
+        if self.wide is None:
+            first, end = max(left, 0), min(right, len(self.text))
+            if first >= end:
+                return None
+            return self.__class__(self.text[first:end], self.style_id, end - first, self.at + Coordinate(first, 0))
+        offsets = list(accumulate((1 + is_wide for is_wide in self.wide), initial=0))
+        first = bisect_left(offsets, left) if left > 0 else 0
+        end = bisect_right(offsets, right) - 1
+        if first >= end:
+            return None
+        wide = self.wide[first:end]
+        width = offsets[end] - offsets[first]
+        return self.__class__(
+            self.text[first:end], self.style_id, width, self.at + Coordinate(offsets[first], 0),
+            wide if width != end - first else None,
+        )
+
+    def cells(self) -> tuple[list[str], bytes]:
+        """Characters and :obj:`CharType` values of every cell, in order."""
+        if self.wide is None:
+            return list(self.text), bytes((_NORMAL,)) * len(self.text)
+        chars = []
+        char_types = bytearray()
+        for char, is_wide in zip(self.text, self.wide):
+            if is_wide:
+                chars += (char, "")
+                char_types += _WIDE_PAIR
+            else:
+                chars.append(char)
+                char_types.append(_NORMAL)
+        return chars, bytes(char_types)
 
 DrawCommand: TypeAlias = DrawPixel | DrawBox | DrawStringLine
 
@@ -592,6 +763,11 @@ class Frame:
     screen_rect: Rect
     default_style: ComputedStyle
     measure_text: MeasureTextFunc = field(hash=False, compare=False)
+    defer_clipping: bool = False
+    """If set, render functions cached with ``translate=True`` that fit on the screen
+    are rendered as if they were fully visible, and the result is clipped to the
+    view box when it is drawn. Such nodes can not draw outside of their own box.
+    See :obj:`functui.cache.RenderCache`."""
 
     def with_style(self, style: ComputedStyle):
         return self.__class__(
@@ -599,16 +775,24 @@ class Frame:
             screen_rect=self.screen_rect,
             default_style=style,
             measure_text=self.measure_text,
+            defer_clipping=self.defer_clipping,
         )
 
-    def shrink_to(self, other_box):
+    def with_view_box(self, view_box: Box):
         return Frame(
-            view_box=self.view_box.intersect(other_box),
+            view_box=view_box,
             screen_rect=self.screen_rect,
             default_style=self.default_style,
             measure_text=self.measure_text,
+            defer_clipping=self.defer_clipping,
         )
 
+    def shrink_to(self, other_box):
+        return self.with_view_box(self.view_box.intersect(other_box))
+
+    def offset_by(self, coordinate: Coordinate):
+        return self.with_view_box(self.view_box.offset_by(coordinate))
+
 
 class MinSize(Protocol):
     """A function that returns a :obj:`Layout`'s minimum size.
@@ -685,34 +869,86 @@ class ResultData(ABC):
     def merge_children(self, child_data: Self) -> Self:
         ...
 
+    def merge_children_in_place(self, child_data: Self) -> Self:
+        """Like :meth:`merge_children`, but may modify and return self.
+
+        Only called on data that :meth:`merge_children` returned for the
+        result that is being built, which nothing else refers to yet. Data
+        that is expensive to copy should override this, so that merging many
+        children copies it once instead of once per child.
+        """
+        return self.merge_children(child_data)
+
+    def offset_by(self, coordinate: Coordinate) -> Self:
+        """Move this data by coordinate, used when a result rendered in local coordinates is put into place.
+
+        Data that stores positions must override this, other data is returned as is.
+        """
+        return self
+
+    def clipped_to(self, box: Box) -> Self:
+        """Limit this data to the part of the screen inside box, used when a result is clipped while drawing.
+
+        Data that stores visible regions must override this, other data is returned as is.
+        """
+        return self
+
 
 @dataclass(unsafe_hash=True)
 class Result:
-    _draw_commands: list[DrawCommand] = field(default_factory=list)
+    # Draw commands form a tree: child results are referenced rather than copied,
+    # so a cached child is shared by every parent that uses it.
+    # The tree is flattened once, when the result is drawn (see iter_commands).
+    _draw_commands: list["DrawCommand | Result"] = field(default_factory=list)
     _data: dict[type[ResultData], ResultData] = field(default_factory=dict)
+    _offset: Coordinate = Coordinate(0, 0)
+    """Moves all draw commands of this result and its children."""
+    _clip: Box | None = None
+    """Limits drawing of this result and its children to a box, in the same coordinates as ``_offset``."""
+    _merged: set[type[ResultData]] = field(default_factory=set, compare=False, repr=False)
+    """Data types whose data was created by merging children into this result, and may be modified in place."""
+    _unmoved: "Result | None" = field(default=None, compare=False, repr=False)
+    """Result whose data, moved by ``_offset`` and clipped to ``_clip``, is the data of this result.
+    It is moved when it is first read, see :meth:`offset_by`."""
+
+    def _all_data(self) -> dict[type[ResultData], ResultData]:
+        source = self._unmoved
+        if source is not None:
+            self._unmoved = None
+            data = {k: data.offset_by(self._offset) for k, data in source._all_data().items()}
+            if self._clip is not None:
+                data = {k: data.clipped_to(self._clip) for k, data in data.items()}
+            data.update(self._data)
+            self._data = data
+        return self._data
 
     def add_children_after(self, child_results: list[Self]):
+        own_data = self._all_data()
         for child in child_results:
-            self._draw_commands.extend(child._draw_commands)
+            if child._draw_commands:
+                self._draw_commands.append(child)
             # if some node does not provide data of a type but child does, then create a dummy
-            for k, child_data in child._data.items():
-                if k in self._data:
-                    self._data[k] = self._data[k].merge_children(child_data)
+            for k, child_data in child._all_data().items():
+                if k in self._merged:
+                    own_data[k] = own_data[k].merge_children_in_place(child_data)
+                elif k in own_data:
+                    own_data[k] = own_data[k].merge_children(child_data)
+                    self._merged.add(k)
                 else:
-                    self._data[k] = child_data
+                    own_data[k] = child_data
 
     def try_data[T: (ResultData)](self, key: type[T]) -> T | None:
-        if key in self._data:
-            return self._data[key]
-        return None
+        return self._all_data().get(key) # type: ignore
 
     def expect_data[T: (ResultData)](self, key: type[T]) -> T:
-        if key in self._data:
-            return self._data[key]
+        data = self._all_data()
+        if key in data:
+            return data[key] # type: ignore
         raise
 
     def set_data(self, data: ResultData):
-        self._data[data.__class__] = data
+        self._all_data()[data.__class__] = data
+        self._merged.discard(data.__class__)
 
 
     def draw_pixel(self, frame: Frame, fill: str, at: Coordinate):
@@ -759,44 +995,91 @@ class Result:
         if (at.x +content_len < bounds.position.x) or (at.x >= outer_x_bound):
             return
 
-        # find initial x offset
+        # find the first character that starts inside the bounds
         #         #---#
         #    content  |
         #    ^^^^^#---#
+        widths = prefix_widths(content, frame.measure_text)
         required_offset = bounds.position.x - at.x
-        x_content_offset = 0
-        char_offset = 0
-        if required_offset > 0:
-            for char in content:
-                x_content_offset += frame.measure_text(char)
-                char_offset += 0
-                if x_content_offset >= required_offset:
-                    break
+        first = bisect_left(widths, required_offset) if required_offset > 0 else 0
+        # and the character after the last one that ends inside the bounds
+        end = bisect_right(widths, outer_x_bound - at.x) - 1
+        if first >= end:
+            return
 
-        # generate output string
-        out = []
-        for char in content[char_offset:]:
-            char_width = frame.measure_text(char)
-            x_content_offset += char_width
-            if x_content_offset + at.x > outer_x_bound:
-                break
-            if char_width == 1:
-                out.append(Pixel(char=char, style=frame.default_style))
-            else:
-                out.append(Pixel(
-                    char=char,
-                    char_type=CharType.WIDE_HEAD,
-                    style=frame.default_style
-                ))
-                out.append(Pixel(
-                    char="",
-                    char_type=CharType.WIDE_TAIL,
-                    style=frame.default_style
-                ))
+        text = content[first:end]
+        if isinstance(widths, range): # every character is one cell wide
+            wide = None
+            width = len(text)
+        else:
+            wide = bytes(widths[i + 1] - widths[i] != 1 for i in range(first, end))
+            width = len(text) + sum(wide)
+            if width == len(text):
+                wide = None
         self._draw_commands.append(DrawStringLine(
-            tuple(out), at + Coordinate(required_offset if required_offset > 0 else 0, 0)
+            text, frame.default_style.id, width, at + Coordinate(widths[first], 0), wide
         ))
-    def get_commands(self): return tuple(self._draw_commands)
+    def offset_by(self, coordinate: Coordinate, clip: Box | None = None) -> "Result":
+        """Get a result that draws this result moved by coordinate.
+
+        If clip is given, drawing is limited to the part of the moved result inside clip.
+        This result is referenced, not copied. Its data is moved when it is
+        first read, so moving a cached result whose data nobody reads is cheap.
+        """
+        return Result(
+            [self] if self._draw_commands else [],
+            {},
+            coordinate,
+            clip,
+            _unmoved=self,
+        )
+
+    def iter_placed_commands(self) -> Iterator[tuple[DrawCommand, int, int, Box | None]]:
+        """Iterates over every draw command of this result and its children, in drawing order.
+
+        Commands are not moved, instead every command is yielded together
+        with the x and y offset it should be drawn at and the box it must be
+        clipped to (already moved), or None if it does not need clipping.
+        """
+        clip = self._clip
+        stack = [(iter(self._draw_commands), self._offset.x, self._offset.y, clip)]
+        while stack:
+            commands, dx, dy, clip = stack[-1]
+            for item in commands:
+                if isinstance(item, Result):
+                    child_clip = clip
+                    if item._clip is not None:
+                        child_clip = item._clip.offset_by(Coordinate(dx, dy))
+                        if clip is not None:
+                            child_clip = child_clip.intersect(clip)
+                    stack.append((iter(item._draw_commands), dx + item._offset.x, dy + item._offset.y, child_clip))
+                    break
+                yield item, dx, dy, clip
+            else:
+                stack.pop()
+
+    def iter_commands(self) -> Iterator[DrawCommand]:
+        """Iterates over every draw command of this result and its children, in drawing order.
+
+        Commands are moved into place and clipped, commands that are clipped away entirely are skipped.
+        """
+        for command, dx, dy, clip in self.iter_placed_commands():
+            if dx or dy:
+                command = command.offset_by(Coordinate(dx, dy))
+            if clip is not None:
+                command = command.clipped_to(clip)
+                if command is None:
+                    continue
+            yield command
+
+    def get_commands(self): return tuple(self.iter_commands())
+
+    def cache_weight(self) -> int:
+        """Number of entries owned by this result, used to bound the memory of render caches.
+
+        Child results are not counted, as they are shared with (and counted by) other cache entries.
+        """
+        return len(self._draw_commands) + 1
 
 
 # I have concidered individual classes for this
@@ -817,28 +1100,84 @@ class Result:
 # it beign split between multiple methods would 
 
 
-@dataclass(frozen=True)
+_interned_layouts: WeakValueDictionary[tuple, "Layout"] = WeakValueDictionary()
+
+@render_cache(name=MIN_SIZE_CACHE_NAME, maxsize=MIN_SIZE_CACHE_MAX_SIZE)
+def _cached_min_size(layout: "Layout", measure_text: MeasureTextFunc, rect: Rect) -> Rect:
+    return layout._min_size(measure_text, rect)
+
+@dataclass(frozen=True, eq=False, init=False)
 class Layout:
     """An immutable layout that can be rendered as a string
 
+    Layouts are hash-consed. Creating a layout that is structurally equal to
+    a layout that already exists (same ``func``, same render function and
+    equal render arguments) returns the existing object. This makes hashing
+    and comparing layouts cheap, which matters because layouts are used as
+    keys by render caches.
+
     Attributes:
         func: The function that returned this layout. Used to give this layout a name.
-        min_size: Function that returns
 
+    Examples:
+        >>> from functui.common import text, border
+        >>> text("hi") | border is text("hi") | border
+        True
     """
     func: Callable
-    min_size: MinSize
+    _min_size: MinSize = field(repr=False)
     render: partial[Result]
+    _key: tuple = field(repr=False)
+    _hash: int = field(repr=False)
+    _forwards_min_size: bool = field(repr=False)
+
+    def __new__(cls, func: Callable, min_size: MinSize, render: partial[Result]):
+        key = (func, render.func, render.args, tuple(render.keywords.items()))
+        try:
+            h = hash(key)
+            interned = True
+        except TypeError: # unhashable render arguments can not be interned
+            h = hash((func, render.func))
+            interned = False
+        if interned and (existing := _interned_layouts.get(key)) is not None:
+            return existing
+
+        self = super().__new__(cls)
+        object.__setattr__(self, "func", func)
+        object.__setattr__(self, "_min_size", min_size)
+        object.__setattr__(self, "render", render)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_hash", h)
+        # wrappers that reuse their child's min_size don't need their own cache entries
+        object.__setattr__(self, "_forwards_min_size", getattr(min_size, "__func__", None) is Layout.min_size)
+        if interned:
+            _interned_layouts[key] = self
+        return self
+
+    def min_size(self, measure_text: MeasureTextFunc, rect: Rect, /) -> Rect:
+        """Get this layout's minimum size, see :obj:`MinSize`.
+
+        Results are cached across frames by layout, available space and
+        measure function in the ``functui.classes.Layout.min_size`` cache
+        (see :mod:`functui.cache`), which keeps :obj:`MIN_SIZE_CACHE_MAX_SIZE`
+        entries by default.
+        """
+        if self._forwards_min_size:
+            return self._min_size(measure_text, rect)
+        return _cached_min_size(self, measure_text, rect)
 
     def __or__(self, other):
         return other(self)
     def __hash__(self) -> int:
-        # print("hej", self.func.__module__)
-        h = hash((self.func, *self.render.args))
-        # print(h)
-        return h
+        return self._hash
     def __eq__(self, value: object, /) -> bool:
-        return hash(self) == hash(value)
+        if self is value:
+            return True
+        if not isinstance(value, Layout):
+            return NotImplemented
+        # interned layouts are only equal if they are the same object,
+        # so this only does real work for layouts that could not be interned
+        return self._hash == value._hash and self._key == value._key
 
 class WrapperNode(Protocol):
     """A function that creates a layout based on a child layout.
@@ -850,102 +1189,250 @@ class WrapperNode(Protocol):
     def __call__(self, child_layout: Layout, /) -> Layout:
         ...
 
+def visible_children[T](placed: Iterable[tuple[T, Box]], view_box: Box, vertical: bool = True) -> Iterator[tuple[T, Box]]:
+    """Filter children laid out one after another to the ones worth rendering.
+
+    Meant for container nodes. Children that lie entirely before or after
+    ``view_box`` along the axis are skipped, except for the one right before
+    and the one right after it. Those are kept so that their interaction
+    areas exist, which lets keyboard navigation scroll to them. A keyboard
+    active child further away has no area, :obj:`functui.nav.v_scroll` then
+    renders its child with a growing view box until it is found.
+    ``placed`` is consumed lazily and no further children are taken from
+    it once one after the view box was found.
+
+    Args:
+        placed: Children and the boxes they were placed in, in order along the axis.
+        view_box: The visible area, usually ``frame.view_box``.
+        vertical: Whether children are laid out along the y axis, otherwise along the x axis.
+
+    Examples:
+        >>> placed = [(i, Box(10, 2, Coordinate(0, i * 2))) for i in range(10)]
+        >>> [i for i, _ in visible_children(placed, Box(10, 4, Coordinate(0, 7)))]
+        [2, 3, 4, 5, 6]
+    """
+    if vertical:
+        start = view_box.position.y
+        end = start + view_box.height
+    else:
+        start = view_box.position.x
+        end = start + view_box.width
+    before = None
+    for item in placed:
+        child_box = item[1]
+        if vertical:
+            child_start, child_size = child_box.position.y, child_box.height
+        else:
+            child_start, child_size = child_box.position.x, child_box.width
+        if child_start + child_size <= start:
+            before = item
+            continue
+        if before is not None:
+            yield before
+            before = None
+        yield item
+        if child_start >= end:
+            return
+    if before is not None:
+        yield before
+
 @dataclass(frozen=True, eq=True)
 class ResultCreatedWith(ResultData):
     """this is added to a result by the get_result function so that this data can later be used by any rendering function"""
     measure_text_func: MeasureTextFunc
     screen_size: Rect
+    render_time: float = field(default=0.0, compare=False)
+    """Seconds spent rendering the layout."""
     def merge_children(self, child_data):
         raise RuntimeError("Result should not be merged with with this data")
 
-def layout_to_result(layout: Layout, dimensions: Rect, measure_text: MeasureTextFunc = lambda t: wcwidth.wcswidth(t)) -> Result:
+def layout_to_result(
+    layout: Layout,
+    dimensions: Rect,
+    measure_text: MeasureTextFunc = text_width,
+    defer_clipping: bool = False,
+) -> Result:
     """Converts a layout to a result that can be converted to desired output type.
 
+    If defer_clipping is set, nodes that are only partially visible (for example
+    inside a scrolled container) are rendered in full and clipped when the
+    result is drawn, so their cached results can be reused at every scroll
+    position. See :obj:`Frame.defer_clipping`.
+
     See Also:
         To see what to do with the result, read :doc:`../user_guide/io`.
     """
+    next_frame()
+    start = perf_counter()
     result = layout.render(
         Frame(
             screen_rect=dimensions,
             view_box=Box(dimensions.width, dimensions.height),
             default_style=ComputedStyle(fg=Color4.RESET, bg=Color4.RESET),
-            measure_text=measure_text
+            measure_text=measure_text,
+            defer_clipping=defer_clipping,
         ),
         Box(width=dimensions.width, height=dimensions.height),
     )
-    result.set_data(ResultCreatedWith(measure_text, screen_size=dimensions))
-    return result
-
-def _get_default_data(width: int, height: int):
-    return [[Pixel() for _ in range(width)] for _ in range(height)]
+    # the rendered result may be cached, so it is wrapped instead of modified
+    root = Result()
+    root.add_children_after([result])
+    root.set_data(ResultCreatedWith(measure_text, screen_size=dimensions, render_time=perf_counter() - start))
+    return root
+
+_CHAR_TYPE_BY_VALUE = {i.value: i for i in CharType}
+_NORMAL = CharType.NORMAL.value
+_WIDE_HEAD = CharType.WIDE_HEAD.value
+_WIDE_TAIL = CharType.WIDE_TAIL.value
+_WIDE_PAIR = bytes((_WIDE_HEAD, _WIDE_TAIL))
 
 class Screen:
-    """Represents the text grid of a screen."""
+    """Represents the text grid of a screen.
+
+    Cells are stored row by row in three flat arrays of ``width * height``
+    items, so that whole rows can be written and compared with slices.
+
+    Attributes:
+        chars: The character of every cell. Wide character tails are empty strings.
+        style_ids: The id of every cell's :obj:`ComputedStyle`.
+        char_types: The :obj:`CharType` value of every cell.
+    """
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
         self.wide_char_cutoff = "#"
-        self._data: list[list[Pixel]] = _get_default_data(width, height)
+        size = width * height
+        self.chars: list[str] = [" "] * size
+        self.style_ids: array[int] = array("I", [0]) * size
+        self.char_types: bytearray = bytearray([_NORMAL]) * size
+
+    def _index(self, pos: Coordinate) -> int:
+        if not (0 <= pos.x < self.width and 0 <= pos.y < self.height):
+            raise IndexError(f"{pos} is outside of the screen.")
+        return pos.y * self.width + pos.x
 
     def get(self, pos: Coordinate) -> Pixel:
-        return self._data[pos.y][pos.x]
+        i = self._index(pos)
+        return Pixel(self.chars[i], _CHAR_TYPE_BY_VALUE[self.char_types[i]], _styles[self.style_ids[i]])
 
     def set(self, pos: Coordinate, data: Pixel) -> None:
         """may error if out of range!!!"""
-        self._data[pos.y][pos.x] = data
+        i = self._index(pos)
+        self.chars[i] = data.char
+        self.style_ids[i] = data.style.id
+        self.char_types[i] = data.char_type.value
+
+    def line_range(self, y: int) -> slice:
+        """Slice of the flat arrays that holds line y."""
+        return slice(y * self.width, (y+1) * self.width)
+
     def split_by_lines(self) -> list[list[Pixel]]:
-        # BUG
-        # right now wide chars wont be frickign yeah
-        return self._data
-        #     # current_row = tuple(i for i in current_row if i.char_type != CharType.WIDE_TAIL)
-        #     out.append(current_row)
-        # return out
+        """Get all cells as pixels, line by line.
+
+        Note:
+            Pixels are created on every call, prefer reading
+            :attr:`chars` and :attr:`style_ids` directly in hot code.
+        """
+        return [
+            [
+                Pixel(char, _CHAR_TYPE_BY_VALUE[char_type], _styles[style_id])
+                for char, style_id, char_type in zip(self.chars[r], self.style_ids[r], self.char_types[r])
+            ]
+            for r in map(self.line_range, range(self.height))
+        ]
+
     def clear(self):
-        p = Pixel()
-        for y in range(self.height):
-            for x in range(self.width):
-                self._data[y][x] = p
+        size = self.width * self.height
+        self.chars[:] = [" "] * size
+        self.style_ids[:] = array("I", [0]) * size
+        self.char_types[:] = bytearray([_NORMAL]) * size
+
+    def _fill(self, x: int, y: int, width: int, height: int, char: str, style_id: int, char_type: int):
+        # clip to screen
+        x2 = min(x + width, self.width)
+        y2 = min(y + height, self.height)
+        x = max(x, 0)
+        y = max(y, 0)
+        if x >= x2 or y >= y2:
+            return
+        width = x2 - x
+        if width == 1: # vertical lines and single pixels
+            for i in range(y * self.width + x, y2 * self.width + x, self.width):
+                self.chars[i] = char
+                self.style_ids[i] = style_id
+                self.char_types[i] = char_type
+            return
+        chars = [char] * width
+        style_ids = array("I", [style_id]) * width
+        char_types = bytearray([char_type]) * width
+        for row in range(y, y2):
+            i = row * self.width + x
+            self.chars[i:i+width] = chars
+            self.style_ids[i:i+width] = style_ids
+            self.char_types[i:i+width] = char_types
+
+    def _write_string(self, command: DrawStringLine, dx: int = 0, dy: int = 0):
+        x = command.at.x + dx
+        y = command.at.y + dy
+        if not (0 <= y < self.height):
+            return
+        start = max(-x, 0)
+        end = min(command.width, self.width - x)
+        if start >= end:
+            return
+        width = end - start
+        i = y * self.width + x + start
+        if command.wide is None:
+            self.chars[i:i+width] = command.text[start:end]
+            self.char_types[i:i+width] = bytes((_NORMAL,)) * width
+        else:
+            chars, char_types = command.cells()
+            self.chars[i:i+width] = chars[start:end]
+            self.char_types[i:i+width] = char_types[start:end]
+        self.style_ids[i:i+width] = array("I", [command.style_id]) * width
 
     def apply_draw_commands(self, measure_text_func: Callable[[str], int],  draw_commands: Iterable[DrawCommand]):
-        for command in draw_commands:
+        self._apply_placed_commands((command, 0, 0, None) for command in draw_commands)
+
+    def apply_result(self, result: "Result"):
+        """Draw every command of a result, see :obj:`Result.iter_placed_commands`."""
+        self._apply_placed_commands(result.iter_placed_commands())
+
+    def _apply_placed_commands(self, placed_commands: Iterable[tuple[DrawCommand, int, int, Box | None]]):
+        for command, dx, dy, clip in placed_commands:
+            if clip is not None:
+                command = command.offset_by(Coordinate(dx, dy)).clipped_to(clip)
+                if command is None:
+                    continue
+                dx = dy = 0
             if isinstance(command, DrawPixel):
-                self.set(command.at, command.pixel)
+                self._fill(command.at.x + dx, command.at.y + dy, 1, 1, command.pixel.char, command.pixel.style.id, command.pixel.char_type.value)
 
             elif isinstance(command, DrawBox):
                 box = command.box
-                for x in range(box.position.x, box.position.x + box.width):
-                    for y in range(box.position.y, box.position.y + box.height):
-                        self.set(Coordinate(x, y), command.fill)
+                self._fill(box.position.x + dx, box.position.y + dy, box.width, box.height, command.fill.char, command.fill.style.id, command.fill.char_type.value)
             else: #DrawStringLine
-                for delta_x, pixel in enumerate(command.string):
-
-                    at = Coordinate(command.at.x + delta_x, command.at.y)
-                    self.set(at, pixel)
+                self._write_string(command, dx, dy)
         # self._clean_up_wide_chars()
 
     def _clean_up_wide_chars(self):
-        # print("".join(str(i.char_type) for i in self._data))
-        for line in self._data:
-            for i, pixel in enumerate(line):
-                if ((i+1) % self.width) == 0: # if on last char of line
-                    continue
-                next_pixel = line[i+1]
-                # print("comparing", pixel.char_type, next_pixel.char_type)
-                match (pixel.char_type, next_pixel.char_type):
-                    case (CharType.NORMAL, CharType.NORMAL)\
-                        | (CharType.WIDE_TAIL, CharType.NORMAL)\
-                        | (CharType.WIDE_HEAD, CharType.WIDE_TAIL)\
-                        | (CharType.NORMAL, CharType.WIDE_HEAD)\
-                        | (CharType.WIDE_TAIL, CharType.WIDE_HEAD):
+        types = self.char_types
+        for y in range(self.height):
+            for i in range(y * self.width, (y+1) * self.width - 1): # skip last char of line
+                match (types[i], types[i+1]):
+                    case (CharType.NORMAL.value, CharType.NORMAL.value)\
+                        | (CharType.WIDE_TAIL.value, CharType.NORMAL.value)\
+                        | (CharType.WIDE_HEAD.value, CharType.WIDE_TAIL.value)\
+                        | (CharType.NORMAL.value, CharType.WIDE_HEAD.value)\
+                        | (CharType.WIDE_TAIL.value, CharType.WIDE_HEAD.value):
                         continue
-                    case (CharType.WIDE_HEAD, CharType.WIDE_HEAD)\
-                        | (CharType.WIDE_HEAD, CharType.NORMAL):
-                        line[i] = pixel.with_char_type(CharType.NORMAL)\
-                            .with_char(self.wide_char_cutoff)
+                    case (CharType.WIDE_HEAD.value, CharType.WIDE_HEAD.value)\
+                        | (CharType.WIDE_HEAD.value, CharType.NORMAL.value):
+                        types[i] = _NORMAL
+                        self.chars[i] = self.wide_char_cutoff
                     case _: # [NORMAL, WIDE_TAIL] | [WIDE_TAIL, WIDE_TAIL]
-                        line[i+1] = next_pixel.with_char_type(CharType.NORMAL)\
-                            .with_char(self.wide_char_cutoff)
-        # print("".join(str(i.char_type) for i in self._data))
+                        types[i+1] = _NORMAL
+                        self.chars[i+1] = self.wide_char_cutoff
 
 
 
@@ -972,3 +1459,9 @@ class InputEvent(NamedTuple):
     mouse_position_event: Coordinate | None = None
     """New mouse position.
     Is set to None if mouse position was not changed."""
+    scroll_delta: int = 0
+    """Steps the mouse wheel turned, positive when scrolling down.
+    Consecutive wheel events may be merged into one event with a larger delta."""
+    resize_event: Rect | None = None
+    """New terminal size.
+    Is set to None if the terminal was not resized."""
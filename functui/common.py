@@ -1,5 +1,5 @@
 """Usefull nodes."""
-from functools import reduce, partial, lru_cache
+from functools import reduce, partial
 from enum import Enum, auto, IntFlag
 from types import MappingProxyType
 from typing import NamedTuple, Protocol, Any, Iterable
@@ -8,6 +8,7 @@ import re
 import math
 
 from .classes import *
+from .cache import render_cache
 
 __all__ = [
     'BORDER_DOUBLE',
@@ -114,8 +115,10 @@ def nothing():
     return Layout(
         func=nothing,
         min_size=min_size_constant(Rect(0, 0)),
-        render=partial(lambda f, b: Result()),
+        render=partial(_nothing_render),
     )
+def _nothing_render(frame: Frame, box: Box):
+    return Result()
 
 def empty(node: Layout):
     """A dummy wrapper node for situation when a wrapper node is required but not needed.
@@ -161,7 +164,7 @@ def text(string: str):
         render = partial(_text_render, split_string)
     )
 
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _text_render(text: tuple[str, ...], frame: Frame, box: Box):
     res = Result()
     for y, line in enumerate(text):
@@ -330,7 +333,7 @@ def vbar_custom(char: str = "|"):
         min_size=min_size_constant(Rect(1, 1)),
         render=partial(_vbar_render, char)
     )
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _vbar_render(char: str, frame: Frame, box: Box):
     res = Result()
     res.draw_box(frame, char, Box(1, box.height, box.position))
@@ -342,7 +345,7 @@ def hbar_custom(char: str="-"):
         min_size=min_size_constant(Rect(1, 1)),
         render=partial(_hbar_render, char)
     )
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _hbar_render(char: str, frame: Frame, box: Box):
     res = Result()
     res.draw_box(frame, char, Box(box.width, 1, box.position))
@@ -387,7 +390,7 @@ border_double = custom_border(style=BORDER_DOUBLE)
 border_ascii = custom_border(style=BORDER_ASCII)
 """Puts a border consisting of ascii characters around a layout."""
 
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _border_render(style: BorderStyle, child: Layout, frame: Frame, box: Box):
     res = Result()
     res.draw_box(frame, fill=style.line_v, box=Box(1, box.height, box.position))
@@ -474,6 +477,7 @@ def _push_rule(rule: StyleRule, child: Layout):
         min_size=child.min_size,
         render=partial(_push_rule_render, child, rule)
     )
+@render_cache(translate=True)
 def _push_rule_render(child: Layout, rule: StyleRule, frame: Frame, box: Box):
     return child.render(
         frame.with_style(frame.default_style.apply_rule(rule)),
@@ -672,26 +676,22 @@ def vbox(children: Iterable[Layout], at_y: int=0, reverse: bool=False):
         render=partial(_vbox_render, children, at_y)
     )
 
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _vbox_render(children: Iterable[Layout], at_y: int, frame: Frame, box: Box):
     res=Result()
-    for node in children:
-        child_min_size = node.min_size(frame.measure_text, Rect(box.width, 9999))
-        child_box = Box(box.width, child_min_size.height).offset_by(box.position + Coordinate(0, at_y))
-
-        at_y += child_box.height
-        
-        # # dont do commands for boxes out of bounds who are above
-        # if at_y < 0:
-        #     continue
+    for node, child_box in visible_children(_vbox_place(children, at_y, frame, box), frame.view_box):
         res.add_children_after([
                 node.render(frame.shrink_to(child_box.intersect(box)), child_box)
         ])
-        # if at_y > box.height:
-        #     break
-
     return res
 
+def _vbox_place(children: Iterable[Layout], at_y: int, frame: Frame, box: Box):
+    for node in children:
+        child_min_size = node.min_size(frame.measure_text, Rect(box.width, 9999))
+        child_box = Box(box.width, child_min_size.height).offset_by(box.position + Coordinate(0, at_y))
+        yield node, child_box
+        at_y += child_box.height
+
 def hbox(children: Iterable[Layout], at_x: int=0):
     """A container node that arranges its chilren Horizontaly.
 
@@ -709,18 +709,22 @@ def hbox(children: Iterable[Layout], at_x: int=0):
         min_size=min_size_horizontal([i.min_size for i in children]),
         render=partial(_hbox_render, children, at_x)
     )
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _hbox_render(children: Iterable[Layout], at_x: int, frame: Frame, box: Box):
     res=Result()
-    for node in children:
-        child_min_size = node.min_size(frame.measure_text, box.rect)
-        child_box = Box(child_min_size.width, box.height).offset_by(box.position + Coordinate(at_x, 0))
+    for node, child_box in visible_children(_hbox_place(children, at_x, frame, box), frame.view_box, vertical=False):
         res.add_children_after([
             node.render(frame.shrink_to(child_box.intersect(box)), child_box)
         ])
-        at_x += child_box.width
     return res
 
+def _hbox_place(children: Iterable[Layout], at_x: int, frame: Frame, box: Box):
+    for node in children:
+        child_min_size = node.min_size(frame.measure_text, box.rect)
+        child_box = Box(child_min_size.width, box.height).offset_by(box.position + Coordinate(at_x, 0))
+        yield node, child_box
+        at_x += child_box.width
+
 def center(child: Layout):
     """Shrink and center child layout in remaining space."""
     return Layout(
@@ -729,6 +733,7 @@ def center(child: Layout):
         render=partial(_center_render, child)
     )
 
+@render_cache(translate=True)
 def _center_render(child: Layout, frame: Frame, box: Box):
     min_size = child.min_size(frame.measure_text, box.rect)
     empty_space_x = even_divide(box.width - min_size.width, 2)
@@ -749,6 +754,7 @@ def center_y(child: Layout):
         min_size=child.min_size,
         render=partial(_center_y_render, child)
     )
+@render_cache(translate=True)
 def _center_y_render(child: Layout, frame: Frame, box: Box):
     min_size = child.min_size(frame.measure_text, box.rect)
     empty_space_y = even_divide(box.height - min_size.height, 2)
@@ -767,6 +773,7 @@ def center_x(child: Layout):
         render=partial(_center_x_render, child)
     )
 
+@render_cache(translate=True)
 def _center_x_render(child: Layout, frame: Frame, box: Box):
     min_size = child.min_size(frame.measure_text, box.rect)
     empty_space_x = even_divide(box.width - min_size.width, 2)
@@ -828,6 +835,7 @@ def _shrink_custom(x: bool, y: bool):
         )
     return _curried_shrink_custom
 
+@render_cache(translate=True)
 def _shrink_render(x: bool, y: bool, child: Layout, frame: Frame, box: Box):
     min_size = child.min_size(frame.measure_text, box.rect)
     child_box = Box(
@@ -885,7 +893,7 @@ def offset(x: int=0, y: int=0) -> WrapperNode:
     return _offset
 
 
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _offset_render(by: Coordinate, node: Layout, frame: Frame, box: Box):
     return node.render(frame, box.offset_by(by).resize(top=-by.y, right=-by.x))
 
@@ -920,7 +928,7 @@ def min_width(value: int):
         return Layout(
             func=min_width,
             min_size=lambda mtf, r: child.min_size(mtf, r).union(Rect(value, 0)),
-            render=child.render
+            render=partial(_min_size_render, value, child)
         )
     return _min_width
 def min_height(value: int):
@@ -929,9 +937,12 @@ def min_height(value: int):
         return Layout(
             func=min_height,
             min_size=lambda mtf, r: child.min_size(mtf, r).union(Rect(0, value)),
-            render=child.render
+            render=partial(_min_size_render, value, child)
         )
     return _min_height
+def _min_size_render(value: int, child: Layout, frame: Frame, box: Box):
+    # value is only passed so that layouts with different minimum sizes are not equal
+    return child.render(frame, box)
 
 
 
@@ -1,7 +1,8 @@
 from dataclasses import dataclass
-from functools import lru_cache, partial
+from functools import partial
 from typing import runtime_checkable, Callable, Iterable
 from .classes import *
+from .cache import render_cache
 
 __all__ = [
     "flex",
@@ -75,7 +76,7 @@ def vbox_flex(children: Iterable[Flex | Layout]) -> Layout:
     )
 
 
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _vbox_flex_render(children: tuple[Flex, ...], frame: Frame, box: Box):
     reserved_space = sum(i.node.min_size(frame.measure_text, box.rect).height for i in children if i.basis)
     total_grow = sum(i.grow for i in children)
@@ -83,17 +84,21 @@ def _vbox_flex_render(children: tuple[Flex, ...], frame: Frame, box: Box):
 
     available_space = box.height - reserved_space
     space_rations = even_divide(available_space, total_grow if available_space >= 0 else total_shrink)
-    at_y = 0
+    def place():
+        at_y = 0
+        for flex in children:
+            child_min_height = flex.node.min_size(frame.measure_text, box.rect).height if flex.basis else 0
+            child_box = Box(
+                width=box.width,
+                height=child_min_height + sum(space_rations.pop() for _ in range(flex.grow if available_space >= 0 else flex.shrink))
+            )
+            child_box = child_box.offset_by(box.position + Coordinate(0, at_y))
+            yield flex.node, child_box
+            at_y += child_box.height
+
     res = Result()
-    for flex in children:
-        child_min_height = flex.node.min_size(frame.measure_text, box.rect).height if flex.basis else 0
-        child_box = Box(
-            width=box.width,
-            height=child_min_height + sum(space_rations.pop() for _ in range(flex.grow if available_space >= 0 else flex.shrink))
-        )
-        child_box = child_box.offset_by(box.position + Coordinate(0, at_y))
-        res.add_children_after([flex.node.render(frame.shrink_to(child_box), child_box)])
-        at_y += child_box.height
+    for node, child_box in visible_children(place(), frame.view_box):
+        res.add_children_after([node.render(frame.shrink_to(child_box), child_box)])
     return res
 
 
@@ -153,7 +158,7 @@ def hbox_flex(processed_children: Iterable[Flex | Layout]):
         min_size=min_size_horizontal([i.node.min_size for i in processed_children]),
         render=partial(_hbox_flex_render, processed_children)
     )
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _hbox_flex_render(children: Iterable[Flex], frame: Frame, box: Box):
     reserved_space = sum(i.node.min_size(frame.measure_text, box.rect).width for i in children if i.basis)
     total_grow = sum(i.grow for i in children)
@@ -161,17 +166,21 @@ def _hbox_flex_render(children: Iterable[Flex], frame: Frame, box: Box):
 
     available_space = box.width - reserved_space
     space_rations = even_divide(available_space, total_grow if available_space >= 0 else total_shrink)
-    at_x = 0
+    def place():
+        at_x = 0
+        for flex in children:
+            child_min_width = flex.node.min_size(frame.measure_text, box.rect).width if flex.basis else 0
+            child_box = Box(
+                width=child_min_width + sum(space_rations.pop() for _ in range(flex.grow if available_space >= 0 else flex.shrink)),
+                height=box.height,
+            )
+            child_box = child_box.offset_by(box.position + Coordinate(at_x, 0))
+            yield flex.node, child_box
+            at_x += child_box.width
+
     res = Result()
-    for flex in children:
-        child_min_width = flex.node.min_size(frame.measure_text, box.rect).width if flex.basis else 0
-        child_box = Box(
-            width=child_min_width + sum(space_rations.pop() for _ in range(flex.grow if available_space >= 0 else flex.shrink)),
-            height=box.height,
-        )
-        child_box = child_box.offset_by(box.position + Coordinate(at_x, 0))
-        res.add_children_after([flex.node.render(frame.shrink_to(child_box), child_box)])
-        at_x += child_box.width
+    for node, child_box in visible_children(place(), frame.view_box, vertical=False):
+        res.add_children_after([node.render(frame.shrink_to(child_box), child_box)])
     return res
 
 @dataclass
@@ -228,20 +237,22 @@ def hbox_flex_wrap(children: Iterable[Flex | Layout]) -> Layout:
         render=partial(_hbox_flex_wrap_render, children)
     )
 
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _hbox_flex_wrap_render(children: Iterable[Flex], frame: Frame, box: Box):
     #
     # split by 'lines'
     #
     children_by_lines = _split_flex_by_lines_h(box.width, children, frame.measure_text)
 
-    at_y = 0
-    res = Result()
+    def place_lines():
+        at_y = 0
+        for data in children_by_lines:
+            yield data, Box(box.width, data.bounding_rect.height, box.position + Coordinate(0, at_y))
+            at_y += data.bounding_rect.height
 
-    for data in children_by_lines:
+    def place_in_line(data: _FlexData, line_box: Box):
         children = data.flex_children
         available_width = box.width - data.bounding_rect.width
-        row_height = data.bounding_rect.height
 
         total_grow = sum(i.grow for i in children)
         total_shrink = sum(i.shrink for i in children)
@@ -252,10 +263,14 @@ def _hbox_flex_wrap_render(children: Iterable[Flex], frame: Frame, box: Box):
             child_min_width, child_min_height = flex.node.min_size(frame.measure_text, box.rect) if flex.basis else Rect(0, 0)
             child_box = Box(
                 width=child_min_width + sum(space_rations.pop() for _ in range(flex.grow if available_width >= 0 else flex.shrink)),
-                height=row_height,
+                height=line_box.height,
             )
-            child_box = child_box.offset_by(box.position + Coordinate(at_x, at_y))
-            res.add_children_after([flex.node.render(frame.shrink_to(child_box.intersect(box)), child_box)])
+            child_box = child_box.offset_by(line_box.position + Coordinate(at_x, 0))
+            yield flex.node, child_box
             at_x += child_box.width
-        at_y += row_height
+
+    res = Result()
+    for data, line_box in visible_children(place_lines(), frame.view_box):
+        for node, child_box in visible_children(place_in_line(data, line_box), frame.view_box, vertical=False):
+            res.add_children_after([node.render(frame.shrink_to(child_box.intersect(box)), child_box)])
     return res
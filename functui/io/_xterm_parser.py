@@ -1,124 +1,118 @@
+"""Splits terminal input into characters and escape sequences.
+
+Input is parsed a chunk at a time: a single compiled regex splits a chunk
+into runs of text and escape sequences (delimited by the ECMA-48 grammar),
+and text runs are decoded from UTF-8 at once. Sequences and characters
+that are cut off at the end of a chunk are completed by the next chunk,
+so an escape at the end of the input is held back until more input
+arrives or :meth:`ByteParser.flush` is called.
+"""
 from enum import Enum, auto
 from dataclasses import dataclass
-
-class ParserState(Enum):
-    GROUND = auto()
-    UTF_1_BYTE_LEFT = auto()
-    UTF_2_BYTES_LEFT = auto()
-    UTF_3_BYTES_LEFT = auto()
-    ESC = auto()
-    CSI = auto()
-    OSC = auto()
-    MAYBE_ST = auto() # string terminator
+import codecs
+import re
 
 
 class RawInputType(Enum):
     CHAR = auto()
+    """One or more printable characters."""
     DEL = auto()
     CSI = auto()
     OSC = auto()
     C0 = auto()
+    SS3 = auto()
+    ESC = auto()
+    """An escape that does not start a sequence (the escape key)."""
 
 @dataclass
 class RawInputEvent:
     data: str
     type: RawInputType
 
-ESCAPE_BYTE = ord("\x1b")
+_TOKEN = re.compile(rb"""
+      (?P<CHAR> [\x20-\x7e\x80-\xff]+ )
+    | (?P<CSI>  \x1b\[ (?: \[[\x40-\x7e] | [\x30-\x3f]*[\x20-\x2f]*[\x40-\x7e] ) )  # \x1b[[A are linux console function keys
+    | (?P<OSC>  \x1b\] [^\x07\x1b]* (?: \x07 | \x1b\\ ) )
+    | (?P<SS3>  \x1bO[\x20-\x7e] )
+    | (?P<ESC>  \x1b (?=[^\[\]O]) )
+    | (?P<C0>   [\x00-\x1a\x1c-\x1f] )
+    | (?P<DEL>  \x7f )
+""", re.VERBOSE)
+# the start of a sequence that may still be completed by the next chunk
+_INCOMPLETE = re.compile(rb"\x1b(?:\[\[?|\[[\x30-\x3f]*[\x20-\x2f]*|\][^\x07\x1b]*\x1b?|O)?")
+
+_TYPES = {type.name: type for type in RawInputType}
+
 class ByteParser:
-    buffer: list[int] = []
-    state: ParserState = ParserState.GROUND
+    def __init__(self) -> None:
+        self._pending = b""
+        """Start of a sequence that was cut off at the end of the last chunk."""
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
 
-    def feed(self, byte: int) -> RawInputEvent | None:
-        match self.state:
-            case ParserState.GROUND:
-                if 0x00 <= byte <= 0x1F:
-                    if byte == ESCAPE_BYTE:
-                        self.buffer.append(byte)
-                        self._change_state(ParserState.ESC)
-                        return
+    def feed_bytes(self, data: bytes) -> list[RawInputEvent]:
+        """Feed a chunk of input and return every event that it completes.
 
-                    data = chr(byte)
-                    return RawInputEvent(data, RawInputType.C0)
-                if byte==0x7F:
-                    data = chr(byte)
-                    return RawInputEvent(data, RawInputType.DEL)
-                elif (byte >> 5) == 0b0000_0110: # utf, 2 bytes
-                    self.buffer.append(byte)
-                    self._change_state(ParserState.UTF_1_BYTE_LEFT)
-                    return
-                elif (byte >> 4) == 0b0000_1110: # utf, 2 bytes
-                    self.buffer.append(byte)
-                    self._change_state(ParserState.UTF_2_BYTES_LEFT)
-                    return
-                elif (byte >> 3) == 0b0001_1110: # utf, 2 bytes
-                    self.buffer.append(byte)
-                    self._change_state(ParserState.UTF_3_BYTES_LEFT)
-                    return
+        Examples:
+            >>> parser = ByteParser()
+            >>> parser.feed_bytes("hé\\x1b[".encode())
+            [RawInputEvent(data='hé', type=<RawInputType.CHAR: 1>)]
+            >>> parser.feed_bytes(b"A\\r")
+            [RawInputEvent(data='\\x1b[A', type=<RawInputType.CSI: 3>), RawInputEvent(data='\\r', type=<RawInputType.C0: 5>)]
+        """
+        if self._pending:
+            data = self._pending + data
+            self._pending = b""
+        events = []
+        pos = 0
+        end = len(data)
+        match_token = _TOKEN.match
+        while pos < end:
+            token = match_token(data, pos)
+            if token is None: # an escape that starts a sequence which is not complete
+                if _INCOMPLETE.fullmatch(data, pos):
+                    self._pending = data[pos:]
+                    break
+                events.append(RawInputEvent("\x1b", RawInputType.ESC)) # was not a sequence
+                pos += 1
+                continue
+            kind = token.lastgroup
+            if kind == "CHAR":
+                # a character cut off at the end of the chunk is kept by the decoder
+                text = self._utf8.decode(token[0], final=token.end() < end)
+                if text:
+                    events.append(RawInputEvent(text, RawInputType.CHAR))
+            else:
+                events.append(RawInputEvent(token[0].decode(errors="replace"), _TYPES[kind])) # type: ignore
+            pos = token.end()
+        return events
 
-                # ascii printable character
-                # no need to clear buffer because nothing was put in.
-                return RawInputEvent(chr(byte), RawInputType.CHAR)
-            case ParserState.UTF_1_BYTE_LEFT:
-                # if (byte >> 6) == 0b0000_0010:
-                self.buffer.append(byte)
-                char = bytearray(self.buffer).decode()
-                self._change_state(ParserState.GROUND)
-                return RawInputEvent(
-                    char,
-                    RawInputType.CHAR,
-                )
-                self._change_state(ParserState.GROUND)
-            case ParserState.UTF_2_BYTES_LEFT:
-                self.buffer.append(byte)
-                self._change_state(ParserState.UTF_1_BYTE_LEFT)
-                return
-            case ParserState.UTF_3_BYTES_LEFT:
-                self.buffer.append(byte)
-                self._change_state(ParserState.UTF_2_BYTES_LEFT)
-                return
-            case ParserState.ESC:
-                if byte == ord("["):
-                    self.buffer.append(byte)
-                    self._change_state(ParserState.CSI)
-                    return
-                if byte == ord("]"):
-                    self.buffer.append(byte)
-                    self._change_state(ParserState.OSC)
-                    return
-            case ParserState.OSC:
-                if byte == 0x07: # BEL
-                    self.buffer.append(byte)
-                    data = bytearray(self.buffer).decode()
-                    self._change_state(ParserState.GROUND)
-                    return RawInputEvent(data, RawInputType.OSC) 
-                if byte == ESCAPE_BYTE:
-                    self._change_state(ParserState.MAYBE_ST)
-                    self.buffer.append(byte)
-                    return
-                self.buffer.append(byte)
-            case ParserState.MAYBE_ST:
-                if byte == 0x5C: # is string terminator
-                    self.buffer.append(byte)
-                    data = bytearray(self.buffer).decode()
-                    self._change_state(ParserState.GROUND)
-                    return RawInputEvent(data, RawInputType.OSC)
-                # was not string terminator, just data
-                self._change_state(ParserState.OSC)
-                self.buffer.append(byte)
-                return
-            case ParserState.CSI:
-                if 0x30 <= byte <= 0x3F: # (ASCII 0–9:;<=>?)
-                    # we are in parameter bytes, the escape code will continue
-                    self.buffer.append(byte)
-                    return
-                self.buffer.append(byte)
-                char = bytearray(self.buffer).decode()
-                self._change_state(ParserState.GROUND)
-                return RawInputEvent(char, RawInputType.CSI)
+    @property
+    def pending(self) -> bool:
+        """Whether the end of the input so far may be the start of an escape sequence."""
+        return bool(self._pending)
 
+    def flush(self) -> list[RawInputEvent]:
+        """Parse the pending start of a sequence as if no more input will follow.
 
-    def _change_state(self, new_state: ParserState) -> None:
-        if new_state == ParserState.GROUND:
-            self.buffer.clear()
-        self.state = new_state
+        An escape key press can not be told apart from the start of a sequence
+        until more input arrives, call this when no input followed for a while.
+
+        Examples:
+            >>> parser = ByteParser()
+            >>> parser.feed_bytes(b"\\x1b")
+            []
+            >>> parser.flush()
+            [RawInputEvent(data='\\x1b', type=<RawInputType.ESC: 7>)]
+        """
+        events = []
+        while self._pending:
+            rest = self._pending[1:]
+            self._pending = b""
+            events.append(RawInputEvent("\x1b", RawInputType.ESC))
+            events.extend(self.feed_bytes(rest))
+        return events
+
+    def feed(self, byte: int) -> RawInputEvent | None:
+        """Feed a single byte, see :meth:`feed_bytes`."""
+        events = self.feed_bytes(bytes((byte,)))
+        return events[0] if events else None
@@ -5,6 +5,7 @@ from dataclasses import dataclass
 
 
 from functools import cache
+import re
 
 @cache
 def default_color_to_fg_ansi(color: Color):
@@ -44,38 +45,235 @@ def style_to_ansi(style: StyleAttr):
 
 
 ANSI_RESET_STYLES = "\033[0m"
+ANSI_ERASE_LINE = "\033[K"
+"""Erases from the cursor to the end of the line (EL), using the current background color."""
 
-def _render_ansi(screen: Screen) -> str:
+REPEAT_MIN_RUN = 8
+"""Shortest run of one character that is written with the repeat sequence (REP) instead of in full."""
+
+STYLE_TRANSITIONS_MAX_SIZE = 4096
+"""How many style transitions are remembered, the oldest are forgotten first."""
+
+_ATTR_CODES = (
+    (StyleAttr.BOLD, "1"),
+    (StyleAttr.DIM, "2"),
+    (StyleAttr.ITALIC, "3"),
+    (StyleAttr.UNDERLINE, "4"),
+    (StyleAttr.BLINK, "5"),
+    (StyleAttr.REVERSE, "7"),
+    (StyleAttr.STRIKE_THROUGH, "9"),
+)
+# bold and dim are both turned off by 22, see _sgr_params
+_ATTR_OFF_CODES = (
+    (StyleAttr.ITALIC, "23"),
+    (StyleAttr.UNDERLINE, "24"),
+    (StyleAttr.BLINK, "25"),
+    (StyleAttr.REVERSE, "27"),
+    (StyleAttr.STRIKE_THROUGH, "29"),
+)
+_BOLD_OR_DIM = StyleAttr.BOLD | StyleAttr.DIM
+
+def _color_params(color: Color, base: int) -> str:
+    """SGR parameters that set a color, base is 30 for foreground and 40 for background."""
+    if isinstance(color, int):
+        if color == Color4.RESET:
+            return str(base + 9)
+        if 0 <= color < 8:
+            return str(base + color)
+        if 8 <= color < 16:
+            return str(base + 60 + color - 8)
+        return f"{base + 8};5;{color}"
+    return f"{base + 8};2;{color.r};{color.g};{color.b}"
+
+def _sgr_params(curr: ComputedStyle, new: ComputedStyle) -> list[str]:
+    params = []
+    added = new.attrs & ~curr.attrs
+    removed = curr.attrs & ~new.attrs
+    if removed & _BOLD_OR_DIM:
+        params.append("22")
+        added |= new.attrs & _BOLD_OR_DIM
+    params.extend(code for attr, code in _ATTR_OFF_CODES if attr in removed)
+    params.extend(code for attr, code in _ATTR_CODES if attr in added)
+    if curr.fg != new.fg and new.fg is not None:
+        params.append(_color_params(new.fg, 30))
+    if curr.bg != new.bg and new.bg is not None:
+        params.append(_color_params(new.bg, 40))
+    return params
+
+def _style_transition(curr: ComputedStyle, new: ComputedStyle) -> str:
+    """A single SGR sequence that changes the active style from curr to new.
+
+    Uses a reset followed by the new style when that is shorter than changing every attribute.
+
+    Examples:
+        >>> _style_transition(ComputedStyle(), ComputedStyle(fg=Color4.RED, attrs=StyleAttr.BOLD | StyleAttr.ITALIC))
+        '\\x1b[1;3;31m'
+        >>> _style_transition(ComputedStyle(fg=Color4.RED, attrs=StyleAttr.BOLD), ComputedStyle())
+        '\\x1b[0m'
+    """
+    params = ";".join(_sgr_params(curr, new))
+    from_reset = ";".join(["0", *_sgr_params(ComputedStyle(), new)])
+    if len(from_reset) < len(params):
+        params = from_reset
+    return f"\033[{params}m" if params else ""
+
+_transitions: dict[tuple[int, int], str] = {}
+
+def _style_id_transition(from_id: int, to_id: int) -> str:
+    """Cached :obj:`_style_transition` between two interned styles, see :obj:`STYLE_TRANSITIONS_MAX_SIZE`."""
+    try:
+        return _transitions[(from_id, to_id)]
+    except KeyError:
+        transition = _style_transition(style_by_id(from_id), style_by_id(to_id))
+        while len(_transitions) >= STYLE_TRANSITIONS_MAX_SIZE:
+            del _transitions[next(iter(_transitions))] # dicts keep insertion order
+        _transitions[(from_id, to_id)] = transition
+        return transition
+
+_repeated_char = re.compile(f"([ -~])\\1{{{REPEAT_MIN_RUN - 1},}}")
+
+def _repeat_sequence(match: re.Match) -> str:
+    return f"{match[1]}\033[{len(match[0]) - 1}b"
+
+def _append_cells(out: list[str], chars: list[str], style_ids: Iterable[int], curr_id: int, repeat: bool = False) -> int:
+    """Append styled cells to out, starting from the currently active style.
+
+    Args:
+        repeat: Write long runs of one ascii character with the repeat sequence (REP).
+
+    Returns:
+        The id of the style that is active after the last cell.
+    """
+    first = len(out)
+    run_start = 0
+    for i, style_id in enumerate(style_ids):
+        if style_id != curr_id:
+            out.append("".join(chars[run_start:i]))
+            out.append(_style_id_transition(curr_id, style_id))
+            curr_id = style_id
+            run_start = i
+    out.append("".join(chars[run_start:]))
+    if repeat: # text and transitions alternate, starting with text
+        out[first::2] = [_repeated_char.sub(_repeat_sequence, text) for text in out[first::2]]
+    return curr_id
+
+def _blank_tail_start(screen: Screen, start: int, end: int) -> int:
+    """Index of the first cell of the default styled spaces that end the cells [start, end)."""
+    text = "".join(screen.chars[start:end])
+    # wide character tails are empty strings, so trailing spaces in the text are trailing space cells
+    blank_from = end - (len(text) - len(text.rstrip(" ")))
+    style_ids = screen.style_ids
+    if style_ids[blank_from:end].count(0) == end - blank_from:
+        return blank_from
+    while style_ids[end - 1] == 0:
+        end -= 1
+    return end
+
+def _append_line(out: list[str], screen: Screen, start: int, end: int, curr_id: int, erase_line: bool, repeat: bool) -> int:
+    """Append the cells [start, end) of a screen that end at the end of a line, see :obj:`_append_cells`."""
+    blank_from = _blank_tail_start(screen, start, end) if erase_line else end
+    if blank_from == end:
+        return _append_cells(out, screen.chars[start:end], screen.style_ids[start:end], curr_id, repeat)
+    curr_id = _append_cells(out, screen.chars[start:blank_from], screen.style_ids[start:blank_from], curr_id, repeat)
+    out.append(_style_id_transition(curr_id, 0))
+    out.append(ANSI_ERASE_LINE)
+    return 0
+
+def _render_ansi(screen: Screen, erase_line: bool = False, repeat: bool = False, absolute: bool = False) -> str:
+    """Render every cell of a screen, lines are separated with ``\\n``.
+
+    Args:
+        erase_line: Clear default styled spaces at the end of lines with
+            :obj:`ANSI_ERASE_LINE` instead of writing them.
+        repeat: Write long runs of one character with the repeat sequence (REP).
+            Not every terminal supports it.
+        absolute: Start every line with an absolute cursor move instead of
+            separating lines with ``\\n``. The output then contains no newlines
+            and does not depend on where the cursor is.
+    """
+    out = []
+    curr_id = 0
+    for y in range(screen.height):
+        r = screen.line_range(y)
+        if absolute:
+            out.append(_ansi_move_to(0, y))
+        if erase_line or repeat:
+            curr_id = _append_line(out, screen, r.start, r.stop, curr_id, erase_line, repeat)
+        else:
+            curr_id = _append_cells(out, screen.chars[r], screen.style_ids[r], curr_id)
+        if not absolute:
+            out.append("\n")
+    return "".join(out if absolute else out[:-1]) # -1 to remove the \n on the end
+
+
+DIFF_MERGE_GAP = 4
+"""Unchanged cells between two changed runs that are rewritten instead of
+jumping over them with a cursor move. (a cursor move costs ~8 bytes)"""
+
+def _changed_runs(previous: Screen, screen: Screen, y: int) -> list[tuple[int, int]]:
+    """Find [start, end) ranges of cells on line y that differ between two screens."""
+    runs: list[tuple[int, int]] = []
+    offset = y * screen.width
+    width = screen.width
+    prev_chars, chars = previous.chars, screen.chars
+    prev_styles, styles = previous.style_ids, screen.style_ids
+    def changed(x: int) -> bool:
+        i = offset + x
+        return prev_chars[i] != chars[i] or prev_styles[i] != styles[i]
+
+    x = 0
+    while x < width:
+        if not changed(x):
+            x += 1
+            continue
+        start = x
+        end = x + 1
+        x += 1
+        while x < width and x - end <= DIFF_MERGE_GAP:
+            if changed(x):
+                end = x + 1
+            x += 1
+        # never split a wide character in half
+        if start > 0 and screen.char_types[offset + start] == CharType.WIDE_TAIL.value:
+            start -= 1
+        if end < width and screen.char_types[offset + end - 1] == CharType.WIDE_HEAD.value:
+            end += 1
+        if runs and runs[-1][1] >= start:
+            start = runs.pop()[0]
+        runs.append((start, end))
+    return runs
+
+def _ansi_move_to(x: int, y: int) -> str:
+    return f"\033[{y+1};{x+1}H"
+
+def _render_ansi_diff(previous: Screen, screen: Screen, erase_line: bool = False, repeat: bool = False) -> str:
+    """Render only the cells of screen that differ from a previously displayed screen.
+
+    Every changed run is prefixed with an absolute cursor move, so the output
+    may be written on top of whatever the terminal currently shows as long
+    as it shows ``previous``. Styles are reset at the end of the output.
+    For erase_line and repeat see :obj:`_render_ansi`.
+
+    Returns:
+        An empty string if nothing changed.
+    """
+    assert (previous.width, previous.height) == (screen.width, screen.height), "Can only diff screens of the same size."
     out = []
-    lines = screen.split_by_lines()
-    curr_style = StyleAttr(0)
-    curr_fg = Color4.RESET
-    curr_bg = Color4.RESET
-    for line in lines:
-        for pixel in line:
-            line_str = []
-            if curr_style != pixel.style.attrs:
-                style_changes = (curr_style ^ pixel.style.attrs)
-                new_style =  style_changes & pixel.style.attrs
-                removed_style = bool(style_changes & curr_style)
-                curr_style = pixel.style.attrs
-                # apparantly ANSI_RESET_STYLES also resets color, so we need to set it back.
-                line_str.extend(
-                    [ANSI_RESET_STYLES, style_to_ansi(pixel.style.attrs), default_color_to_fg_ansi(curr_fg), default_color_to_bg_ansi(curr_bg)]\
-                    if removed_style\
-                    else [style_to_ansi(new_style)]
-                )
-            if curr_fg != pixel.style.fg and pixel.style.fg is not None:
-                curr_fg = pixel.style.fg
-                line_str.append(default_color_to_fg_ansi(curr_fg))
-            if curr_bg != pixel.style.bg and pixel.style.bg is not None:
-                curr_bg = pixel.style.bg
-                line_str.append(default_color_to_bg_ansi(curr_bg))
-            if len(line_str):
-                out.extend(line_str)
-            out.append(pixel.char)
-        out.append("\n")
-    return "".join(out[:-1]) # -1 to remove the \n on the end
+    curr_id = 0
+    for y in range(screen.height):
+        r = screen.line_range(y)
+        if previous.chars[r] == screen.chars[r] and previous.style_ids[r] == screen.style_ids[r]:
+            continue
+        for start, end in _changed_runs(previous, screen, y):
+            out.append(_ansi_move_to(start, y))
+            if end == screen.width:
+                curr_id = _append_line(out, screen, r.start+start, r.start+end, curr_id, erase_line, repeat)
+            else:
+                curr_id = _append_cells(out, screen.chars[r.start+start:r.start+end], screen.style_ids[r.start+start:r.start+end], curr_id, repeat)
+    if not out:
+        return ""
+    out.append(ANSI_RESET_STYLES)
+    return "".join(out)
 
 
 def _ansi_go_up(y):
@@ -87,7 +285,7 @@ def result_to_str(result: Result) -> str:
     if data is None:
         raise AssertionError("Result has no ResultCreatedWith data. If possible please use get_result() function to get a result.")
     screen = Screen(data.screen_size.width, data.screen_size.height)
-    screen.apply_draw_commands(data.measure_text_func, result.get_commands()) # 20 %
+    screen.apply_result(result) # 20 %
     return _render_ansi(screen) # 30 %
 
 def layout_to_str(layout: Layout, dimensions: Rect) -> str:
@@ -1,8 +1,10 @@
 """Functions for input and output with the curses module."""
 import curses
 import sys
-from typing import NamedTuple, Any, Callable
+from collections import OrderedDict
+from typing import NamedTuple, Any, Callable, Iterable
 from ..classes import *
+from .ansi import _changed_runs
 from functools import cache
 
 _curses_int_to_standard_key_name = {
@@ -215,110 +217,167 @@ def _color_to_curses(clr: Color):
     #     return 0
     return out
 
-_pair_cache: dict[tuple[int, int], int] = {
-    (-1, -1): 0 #curses alwayst initializes color pair 0 to be (-1 -1)
-}
-def _init_pair_from_style(i: int, style: ComputedStyle):
-    curr_fg, curr_bg = curses.pair_content(i)
-    new_fg = _color_to_curses(style.fg) if style.fg else curr_fg
-    new_bg = _color_to_curses(style.bg) if style.bg else curr_bg
-    try:
-        return _pair_cache[(new_fg, new_bg)]
-    except KeyError:
-        new_pair_number = len(_pair_cache) + 1
-        curses.init_pair(new_pair_number, new_fg, new_bg)
-        _pair_cache[(new_fg, new_bg)] = new_pair_number
-        return new_pair_number
-    return i
+MAX_COLOR_PAIRS = 255
+"""Most color pairs used, a curses attribute can only refer to pairs 1-255."""
 
+class ColorPairAllocator:
+    """Hands out curses color pairs for foreground and background colors.
 
-def draw_result(result: Result, stdscr: curses.window):
-    """Display the result in a curses window.
+    Pairs are defined on first use. Once every pair is taken, the least
+    recently used pair is redefined, so any number of color combinations can
+    be shown as long as one frame does not use more than ``max_pairs``.
+    Pair 0 is always the terminal's default colors.
 
-    You can get the curses window by wrapping your main function in a
-    :func:`wrapper`."""
-    stdscr.erase()
-    data = result.try_data(ResultCreatedWith)
-    if data is None:
-        raise AssertionError("Result must have a ResultCreatedWith data.")
-    pair_number = 1
-    for command in result.get_commands():
-        if isinstance(command, DrawPixel):
-            pair_number = _init_pair_from_style(pair_number, command.pixel.style)
-            stdscr.addch(
-                command.at.y,
-                command.at.x,
-                command.pixel.char,
-                _char_style_to_attr(command.pixel.style.attrs) | curses.color_pair(pair_number)
-            )
-        elif isinstance(command, DrawStringLine):
-            pair_number = _init_pair_from_style(pair_number, command.string[0].style)
-            stdscr.addstr(
-                command.at.y,
-                command.at.x,
-                "".join([i.char for i in command.string if i.char_type != CharType.WIDE_TAIL]),
-                _char_style_to_attr(command.string[0].style.attrs) | curses.color_pair(pair_number)
-            )
-        elif isinstance(command, DrawBox):
-            pair_number = _init_pair_from_style(pair_number, command.fill.style)
-            s = [command.box.width * command.fill.char for _ in range(command.box.height)]
-            for dy, line in enumerate(s):
-                stdscr.addstr(
-                    command.box.position.y + dy,
-                    command.box.position.x,
-                    line,
-                    _char_style_to_attr(command.fill.style.attrs) | curses.color_pair(pair_number)
-                )
-
-
-
-    # screen = Screen(data.screen_size.width, data.screen_size.height)
-    # screen.apply_draw_commands(data.measure_text_func, result.get_commands())
-    # lines = screen.split_by_lines()
-    #
-    # curr_style = CharStyle(0)
-    # curr_fg = Color.RESET
-    # curr_bg = Color.RESET
-    # # curses.init_pair(1, curses.COLOR_BLACK, curses.COLOR_WHITE)
-    # for y, line in enumerate(lines):
-    #     line_str = []
-    #     for x, pixel in enumerate(line):
-    #         if pixel.char_type == CharType.WIDE_TAIL:
-    #             continue
-    #         if curr_style != pixel.style.char_style:
-    #             if line_str:
-    #                 stdscr.addstr(
-    #                     y,
-    #                     x - data.measure_text_func("".join(line_str)),
-    #                     "".join(line_str),
-    #                     char_style_to_attr(curr_style) | pair_number
-    #                 )
-    #                 line_str.clear()
-    #             curr_style = pixel.style.char_style
-    #         if (curr_fg, curr_bg) != (pixel.style.fg, pixel.style.bg):
-    #             if line_str:
-    #                 stdscr.addstr(
-    #                     y,
-    #                     x - data.measure_text_func("".join(line_str)),
-    #                     "".join(line_str),
-    #                     char_style_to_attr(curr_style) | pair_number
-    #                 )
-    #                 line_str.clear()
-    #             pair_number = init_pair_from_style(pair_number, pixel.style)
-    #             curr_fg = pixel.style.fg
-    #             curr_bg = pixel.style.bg
-    #         line_str.append(pixel.char)
-    #     if line_str:
-    #         stdscr.addstr(
-    #             y,
-    #             len(line) - len(line_str),
-    #             "".join(line_str),
-    #             char_style_to_attr(curr_style) | pair_number
-    #         )
+    Examples:
+        >>> pairs = ColorPairAllocator(max_pairs=2, init_pair=lambda *args: None)
+        >>> pairs.pair(1, -1), pairs.pair(2, -1), pairs.pair(1, -1), pairs.pair(3, -1)
+        (1, 2, 1, 2)
+        >>> pairs.pair(-1, -1)
+        0
+    """
+    def __init__(
+        self,
+        max_pairs: int | None = None,
+        init_pair: Callable[[int, int, int], Any] = curses.init_pair,
+    ) -> None:
+        self.max_pairs = max_pairs
+        """Defaults to what the terminal supports (:obj:`curses.COLOR_PAIRS`), up to :obj:`MAX_COLOR_PAIRS`."""
+        self._init_pair = init_pair
+        self._pairs: OrderedDict[tuple[int, int], int] = OrderedDict()
+
+    def pair(self, fg: int, bg: int) -> int:
+        """Get the number of a pair with these curses color numbers, defining it if needed."""
+        if fg == -1 and bg == -1:
+            return 0
+        key = (fg, bg)
+        pair = self._pairs.get(key)
+        if pair is not None:
+            self._pairs.move_to_end(key)
+            return pair
+        if self.max_pairs is None:
+            self.max_pairs = min(curses.COLOR_PAIRS - 1, MAX_COLOR_PAIRS)
+        if len(self._pairs) < self.max_pairs:
+            pair = len(self._pairs) + 1
+        else:
+            _, pair = self._pairs.popitem(last=False)
+        self._init_pair(pair, fg, bg)
+        self._pairs[key] = pair
+        return pair
+
+    def pairs(self, colors: Iterable[tuple[int, int]]) -> dict[tuple[int, int], int]:
+        """Get pairs for all colors shown at once.
+
+        Pairs that are already defined are marked as used before any pair is
+        recycled, so none of the returned pairs redefine each other unless
+        there are more than ``max_pairs`` colors.
+        """
+        colors = set(colors)
+        for key in colors:
+            if key in self._pairs:
+                self._pairs.move_to_end(key)
+        return {key: self.pair(*key) for key in colors}
 
+_color_pairs = ColorPairAllocator()
+"""Curses color pairs are global, so every presenter shares one allocator by default."""
 
 
+class CursesPresenter:
+    """Displays results in a curses window, only redrawing cells that changed.
 
+    Every result is drawn onto a :obj:`~functui.classes.Screen` and compared
+    with the previously displayed one, changed runs of cells are written with
+    one ``addstr`` per style. The window is staged with ``noutrefresh`` and
+    shown with :func:`curses.doupdate`.
+
+    Examples:
+        .. code-block:: python
+
+            def main(stdscr: curses.window):
+                presenter = CursesPresenter(stdscr)
+                while True:
+                    y, x = stdscr.getmaxyx()
+                    res = layout_to_result(view(m), Rect(x, y))
+                    presenter.draw(res)
+                    update(get_input_event(stdscr), res, m)
+
+            wrapper(main)
+    """
+    def __init__(self, stdscr: curses.window, color_pairs: ColorPairAllocator | None = None) -> None:
+        self.stdscr = stdscr
+        self.color_pairs = color_pairs if color_pairs is not None else _color_pairs
+        self._displayed_screen: Screen | None = None
 
+    def force_redraw(self):
+        """Clear the window and draw every cell of the next result, use if something else drew into the window."""
+        self._displayed_screen = None
 
+    def draw(self, result: Result):
+        """Display a result, see :obj:`CursesPresenter`."""
+        data = result.try_data(ResultCreatedWith)
+        if data is None:
+            raise AssertionError("Result must have a ResultCreatedWith data.")
+        size = data.screen_size
+        screen = Screen(size.width, size.height)
+        screen.apply_result(result)
 
+        previous = self._displayed_screen
+        if previous is None or (previous.width, previous.height) != (screen.width, screen.height):
+            self.stdscr.erase()
+            previous = Screen(screen.width, screen.height) # what the erased window shows
+
+        # get every pair of this frame first, so drawing it never recycles one of them
+        colors = {style_id: self._style_colors(style_id) for style_id in set(screen.style_ids)}
+        pairs = self.color_pairs.pairs(colors.values())
+        attrs = {
+            style_id: self._style_attr(style_id) | curses.color_pair(pairs[style_colors])
+            for style_id, style_colors in colors.items()
+        }
+        chars, style_ids = screen.chars, screen.style_ids
+        for y in range(screen.height):
+            r = screen.line_range(y)
+            if previous.chars[r] == chars[r] and previous.style_ids[r] == style_ids[r]:
+                continue
+            for start, end in _changed_runs(previous, screen, y):
+                # split the run into parts with the same style
+                i = r.start + start
+                end += r.start
+                while i < end:
+                    style_id = style_ids[i]
+                    part_end = i + 1
+                    while part_end < end and style_ids[part_end] == style_id:
+                        part_end += 1
+                    self._addstr(y, i - r.start, "".join(chars[i:part_end]), attrs[style_id])
+                    i = part_end
+
+        self._displayed_screen = screen
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+
+    @staticmethod
+    def _style_attr(style_id: int) -> int:
+        """Curses attributes without the color pair, cached by attributes so the cache stays small."""
+        return _char_style_to_attr(style_by_id(style_id).attrs)
+
+    @staticmethod
+    def _style_colors(style_id: int) -> tuple[int, int]:
+        style = style_by_id(style_id)
+        return _color_to_curses(style.fg), _color_to_curses(style.bg)
+
+    def _addstr(self, y: int, x: int, text: str, attr: int):
+        try:
+            self.stdscr.addstr(y, x, text, attr)
+        except curses.error:
+            # writing the bottom right cell moves the cursor out of the window,
+            # which is an error even though the text was written
+            pass
+
+
+def draw_result(result: Result, stdscr: curses.window):
+    """Display the result in a curses window.
+
+    Every cell is redrawn, use a :obj:`CursesPresenter` to only redraw the
+    cells that changed since the last frame.
+
+    You can get the curses window by wrapping your main function in a
+    :func:`wrapper`."""
+    CursesPresenter(stdscr).draw(result)
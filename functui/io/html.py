@@ -1,7 +1,8 @@
 """Functions to convert layouts to html."""
-from ..classes import Layout, Rect, StyleAttr, ComputedStyle, ResultCreatedWith, Screen, Result, Color4, Color24, hex, layout_to_result
+from ..classes import Layout, Rect, StyleAttr, ComputedStyle, ResultCreatedWith, Screen, Result, Color4, Color24, hex, layout_to_result, style_by_id
 from ..color_data import xterm256_to_hex
 from typing import NamedTuple
+from functools import lru_cache
 
 HTML_ESCAPES = {
     "&": "&amp;",
@@ -55,6 +56,12 @@ def style_to_tag(style: ComputedStyle) -> HTMLTags:
         closed="".join(f"</{i}>" for i in tags_closed)
     )
 
+STYLE_TAGS_MAX_SIZE = 1024
+"""How many html tags of styles are remembered, see :func:`style_to_tag`."""
+
+@lru_cache(maxsize=STYLE_TAGS_MAX_SIZE)
+def _style_id_to_tag(style_id: int) -> HTMLTags:
+    return style_to_tag(style_by_id(style_id))
 
 def result_to_html_str(result: Result):
     """Convert a result to an html string.
@@ -65,22 +72,23 @@ def result_to_html_str(result: Result):
     if data is None:
         raise AssertionError("Result has no ResultCreatedWith data. If possible please use get_result() function to get a result.")
     screen = Screen(data.screen_size.width, data.screen_size.height)
-    screen.apply_draw_commands(data.measure_text_func, result.get_commands())
+    screen.apply_result(result)
 
-    curr_style = ComputedStyle()
-    curr_tags = style_to_tag(curr_style)
+    curr_id = 0
+    curr_tags = _style_id_to_tag(curr_id)
     out = [curr_tags.open]
-    for line in screen.split_by_lines():
-        for pixel in line:
-            if pixel.style != curr_style:
+    for y in range(screen.height):
+        r = screen.line_range(y)
+        for char, style_id in zip(screen.chars[r], screen.style_ids[r]):
+            if style_id != curr_id:
                 out.append(curr_tags.closed)
-                curr_style = pixel.style
-                curr_tags = style_to_tag(curr_style)
+                curr_id = style_id
+                curr_tags = _style_id_to_tag(curr_id)
                 out.append(curr_tags.open)
-            if pixel.char in HTML_ESCAPES:
-                out.append(HTML_ESCAPES[pixel.char])
+            if char in HTML_ESCAPES:
+                out.append(HTML_ESCAPES[char])
             else:
-                out.append(pixel.char)
+                out.append(char)
         out.append("\n")
 
     out = out[:-1] # -1 to remove the \n on the end
@@ -43,14 +43,19 @@ from ._xterm_parser import ByteParser, RawInputEvent, RawInputType
 from ._xterm_escape_data import SUQUENCE_TO_KEY
 
 from abc import ABC, abstractmethod
+from collections import deque
 from enum import Enum, auto
-from typing import Any, Callable, TextIO
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, TextIO
 from dataclasses import dataclass
+from math import ceil
+from time import perf_counter
 from ..classes import InputEvent, Coordinate, Rect, intersperse, Result, Screen, ResultCreatedWith
-from .ansi import result_to_str, _render_ansi
+from .ansi import result_to_str, _render_ansi, _render_ansi_diff, ANSI_RESET_STYLES
 
 from queue import SimpleQueue, Empty
 import threading
+import select
+import signal
 import sys
 import ctypes
 import shutil
@@ -66,6 +71,7 @@ class RawInputParser:
         self._paste_buffer: list[str] = []
 
     def feed(self, raw_event: RawInputEvent) -> InputEvent | None:
+        """Feed a raw event, character events must hold a single character."""
         match self.state:
             case RawInputParserState.GROUND:
                 if raw_event.type == RawInputType.CHAR:
@@ -82,6 +88,7 @@ class RawInputParser:
                         prefix, x, y_and_suffix = raw_event.data.split(";", 3)
                         y = y_and_suffix[:-1]
                         data = "unknown"
+                        scroll_delta = 0
                         if button_nr == "0":
                             data = "left mouse" + released_suffix
                         elif button_nr == "1":
@@ -92,10 +99,12 @@ class RawInputParser:
                             data = None
                         elif button_nr == "65":
                             data = "mouse wheel down"
+                            scroll_delta = 1
                         elif button_nr == "64":
                             data = "mouse wheel up"
+                            scroll_delta = -1
 
-                        return InputEvent(key_event=data, mouse_position_event=Coordinate(int(x)-1, int(y)-1))
+                        return InputEvent(key_event=data, mouse_position_event=Coordinate(int(x)-1, int(y)-1), scroll_delta=scroll_delta)
                 if parsed_key := SUQUENCE_TO_KEY.get(raw_event.data, None):
                     return InputEvent(key_event=parsed_key)
                 return InputEvent(key_event="unknown")
@@ -109,6 +118,102 @@ class RawInputParser:
                     self.state = RawInputParserState.GROUND
                     return InputEvent(key_event=data)
 
+    def feed_all(self, raw_events: Iterable[RawInputEvent]) -> list[InputEvent]:
+        """Feed raw events in order and return every input event they complete.
+
+        Unlike :meth:`feed`, character events may hold more than one character,
+        each character becomes its own input event.
+        """
+        feed = self.feed
+        events = []
+        for raw_event in raw_events:
+            if raw_event.type == RawInputType.CHAR:
+                if self.state == RawInputParserState.PASTE:
+                    self._paste_buffer.append(raw_event.data)
+                else:
+                    events.extend(InputEvent(key_event=char) for char in raw_event.data)
+            elif (event := feed(raw_event)) is not None:
+                events.append(event)
+        return events
+
+def coalesce_input_events(events: Iterable[InputEvent], merge_wheel: bool = True) -> list[InputEvent]:
+    """Merge consecutive mouse motion and mouse wheel events.
+
+    Consecutive events that only move the mouse or only resize the terminal
+    are replaced by the last one, consecutive wheel events in the same
+    direction are replaced by one event whose
+    :obj:`~functui.classes.InputEvent.scroll_delta` is their sum. Every other
+    event is kept, in order.
+
+    Args:
+        merge_wheel: Whether to merge wheel events. Only merge them if the
+            :obj:`~functui.classes.InputEvent.scroll_delta` is passed on to
+            :meth:`functui.nav.NavState.update`, otherwise a burst of wheel
+            events scrolls by a single step.
+
+    Examples:
+        >>> moved = [InputEvent(mouse_position_event=Coordinate(x, 0)) for x in range(3)]
+        >>> wheel = InputEvent("mouse wheel down", Coordinate(2, 0), scroll_delta=1)
+        >>> for event in coalesce_input_events([*moved, wheel, wheel, InputEvent("a")]):
+        ...     print(event.key_event, event.mouse_position_event, event.scroll_delta)
+        None Coordinate(x=2, y=0) 0
+        mouse wheel down Coordinate(x=2, y=0) 2
+        a None 0
+    """
+    out: list[InputEvent] = []
+    for event in events:
+        if out:
+            last = out[-1]
+            if _is_mouse_motion(event) and _is_mouse_motion(last):
+                out[-1] = event
+                continue
+            if event.resize_event is not None and last.resize_event is not None:
+                out[-1] = event
+                continue
+            if merge_wheel and event.scroll_delta and last.scroll_delta and event.key_event == last.key_event: # same direction
+                out[-1] = event._replace(scroll_delta=last.scroll_delta + event.scroll_delta)
+                continue
+        out.append(event)
+    return out
+
+def _is_mouse_motion(event: InputEvent) -> bool:
+    return event.key_event is None and event.mouse_position_event is not None and event.resize_event is None
+
+READ_SIZE = 65536
+"""Most bytes read from the input at once."""
+
+ESCAPE_DELAY = 0.025
+"""Seconds to wait for the rest of a sequence after an escape, before it is treated as the escape key."""
+
+class InputDecoder:
+    """Turns bytes read from a terminal into input events.
+
+    Examples:
+        >>> decoder = InputDecoder()
+        >>> [event.key_event for event in decoder.feed_bytes(b"a\x1b[A")]
+        ['a', 'up']
+    """
+    def __init__(self) -> None:
+        self._byte_parser = ByteParser()
+        self._raw_parser = RawInputParser()
+
+    def feed_bytes(self, data: bytes) -> list[InputEvent]:
+        """Feed a chunk of input, sequences may continue in the next chunk."""
+        return self._raw_parser.feed_all(self._byte_parser.feed_bytes(data))
+
+    @property
+    def pending(self) -> bool:
+        """Whether the input ended with what may be the start of an escape sequence, see :meth:`flush`."""
+        return self._byte_parser.pending
+
+    def flush(self) -> list[InputEvent]:
+        """Decode the pending start of a sequence as if no more input will follow.
+
+        Call this if no more input arrived :obj:`ESCAPE_DELAY` seconds after
+        :attr:`pending` became true, so a press of the escape key is not held back.
+        """
+        return self._raw_parser.feed_all(self._byte_parser.flush())
+
 @dataclass(frozen=True, eq=True)
 class TerminalFeatures:
     mouse: bool = False
@@ -116,6 +221,9 @@ class TerminalFeatures:
     alternate_screen: bool = False
     line_wrap: bool = True
     hidden_cursor: bool = False
+    synchronized_output: bool = False
+    """Wrap every displayed frame in synchronized output mode (DEC private mode 2026),
+    so terminals that support it show the frame at once instead of while it is being written."""
     # in_band_window_resize: bool = False
 
 DEFAULT_FEATURES = TerminalFeatures()
@@ -163,12 +271,202 @@ def set_xterm_features(stdout: TextIO, features: TerminalFeatures):
     stdout.flush()
 
 
+SYNCHRONIZED_OUTPUT_BEGIN = "\x1b[?2026h"
+SYNCHRONIZED_OUTPUT_END = "\x1b[?2026l"
+
+WRITE_CHUNK_SIZE = 4096
+"""Most bytes :obj:`FrameWriter` writes at once, so a single write does not block for long."""
+
+PENDING_OUTPUT_RETRY_INTERVAL = 0.01
+"""Seconds :meth:`TerminalIO.block_until_input` waits for the output to become writable between retries."""
+
+class FrameWriter:
+    """Buffers output for a file descriptor and writes it with :func:`os.write` in small chunks.
+
+    Output is encoded into a reused byte buffer. Every call to :meth:`flush`
+    writes chunks of at most :obj:`WRITE_CHUNK_SIZE` bytes while :func:`select.select`
+    reports the file descriptor as writable, the rest is written by later calls.
+    The file descriptor is left in blocking mode, because a terminal's stdin
+    usually shares it and the input reader relies on blocking reads, so a
+    single chunk may still block briefly. This keeps the input loop
+    responsive when the terminal is connected over a slow link.
+
+    Frames written with :meth:`write_frame` can be replaced by a newer frame
+    with :meth:`drop_unstarted_frame` as long as none of their output was
+    written, so a slow terminal only receives the latest frame instead of
+    every frame in turn.
+    """
+    def __init__(self, fd: int, buffer_size: int = 1 << 16) -> None:
+        self.fd = fd
+        self._buffer = bytearray(buffer_size)
+        self._start = 0
+        self._end = 0
+        self._frame: tuple[int, int] | None = None
+        """Start and end of the last frame's output in the buffer, if nothing was written after it."""
+
+    @property
+    def pending(self) -> int:
+        """Number of bytes that were not written yet."""
+        return self._end - self._start
+
+    def write(self, data: str):
+        """Add data to the buffer, nothing is written until :meth:`flush` is called."""
+        self._frame = None
+        self._append(data.encode())
+
+    def write_frame(self, data: str):
+        """Add the output of a frame to the buffer, see :meth:`drop_unstarted_frame`."""
+        encoded = data.encode()
+        self._append(encoded) # may move pending bytes, so the frame is found from the end
+        self._frame = (self._end - len(encoded), self._end)
+
+    def drop_unstarted_frame(self) -> bool:
+        """Remove the output of the last frame from the buffer if none of it was written yet.
+
+        Returns:
+            Whether the frame was removed. It is not if some of it was
+            written already, or if other output was written after it.
+        """
+        if self._frame is None or self._frame[1] != self._end or self._start > self._frame[0]:
+            return False
+        self._end = self._frame[0]
+        self._frame = None
+        if self._start == self._end:
+            self._start = self._end = 0
+        return True
+
+    def _append(self, encoded: bytes):
+        end = self._end + len(encoded)
+        if end > len(self._buffer):
+            if self._start: # move the pending bytes to the front before growing
+                self._buffer[:self.pending] = self._buffer[self._start:self._end]
+                if self._frame is not None:
+                    frame_start, frame_end = self._frame
+                    self._frame = (frame_start - self._start, frame_end - self._start) if frame_start >= self._start else None
+                self._end -= self._start
+                self._start = 0
+                end = self._end + len(encoded)
+            if end > len(self._buffer):
+                self._buffer.extend(bytes(max(end, 2 * len(self._buffer)) - len(self._buffer)))
+        self._buffer[self._end:end] = encoded
+        self._end = end
+
+    def flush(self, timeout: float | None = 0) -> bool:
+        """Write buffered output.
+
+        Args:
+            timeout: Seconds to wait for the file descriptor to accept more output,
+                or None to wait until everything is written.
+        Returns:
+            True if everything was written.
+        """
+        with memoryview(self._buffer) as view:
+            while self._start < self._end:
+                if not self.wait_writable(timeout):
+                    return False
+                self._start += os.write(self.fd, view[self._start:min(self._end, self._start + WRITE_CHUNK_SIZE)])
+        self._start = self._end = 0
+        self._frame = None
+        return True
+
+    def wait_writable(self, timeout: float | None) -> bool:
+        """Wait at most timeout seconds (forever if None) until the file descriptor accepts output."""
+        _, writable, _ = select.select([], [self.fd], [], timeout)
+        return bool(writable)
+
+
+class FrameTiming(NamedTuple):
+    """Seconds spent in every phase of displaying one result.
+
+    Attributes:
+        layout: Rendering the layout, see :obj:`functui.classes.ResultCreatedWith.render_time`.
+        rasterize: Drawing the result onto a screen.
+        encode: Converting the screen to ansi.
+        write: Writing the ansi string to the terminal.
+        flush: Flushing the terminal output.
+    """
+    layout: float
+    rasterize: float
+    encode: float
+    write: float
+    flush: float
+
+    @property
+    def total(self) -> float:
+        return self.layout + self.rasterize + self.encode + self.write + self.flush
+
+FRAME_TIMINGS_MAX_SIZE = 600
+"""How many frames :obj:`FrameTimings` remembers by default."""
+
+class FrameTimings:
+    """The timings of the last ``maxlen`` displayed frames.
+
+    Examples:
+        >>> timings = FrameTimings()
+        >>> for i in range(1, 101):
+        ...     timings.append(FrameTiming(0, i / 1000, 0, 0, 0))
+        >>> timings.p50(), timings.p99("rasterize")
+        (0.05, 0.099)
+    """
+    def __init__(self, maxlen: int = FRAME_TIMINGS_MAX_SIZE) -> None:
+        self._frames: deque[FrameTiming] = deque(maxlen=maxlen)
+
+    def append(self, timing: FrameTiming):
+        self._frames.append(timing)
+
+    def clear(self):
+        self._frames.clear()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __iter__(self) -> Iterator[FrameTiming]:
+        return iter(self._frames)
+
+    @property
+    def last(self) -> FrameTiming | None:
+        return self._frames[-1] if self._frames else None
+
+    def percentile(self, percent: float, phase: str = "total") -> float:
+        """Time in seconds that percent of the remembered frames spent at most in phase.
+
+        Args:
+            phase: A field of :obj:`FrameTiming` or ``"total"``.
+        Returns:
+            The time, or 0 if no frames were recorded.
+        """
+        if not self._frames:
+            return 0.0
+        values = sorted(getattr(frame, phase) for frame in self._frames)
+        index = max(ceil(percent / 100 * len(values)) - 1, 0) # nearest rank
+        return values[min(index, len(values) - 1)]
+
+    def p50(self, phase: str = "total") -> float:
+        return self.percentile(50, phase)
+
+    def p95(self, phase: str = "total") -> float:
+        return self.percentile(95, phase)
+
+    def p99(self, phase: str = "total") -> float:
+        return self.percentile(99, phase)
+
+
 class TerminalIO(ABC):
     """Terminal input output object that has both windows and unix implemintions.
 
+    Attributes:
+        erase_line: Clear blank line endings with an erase sequence instead of writing spaces.
+        repeat_chars: Write long runs of one character with the repeat sequence (REP).
+            Disabled by default because some terminals do not support it.
+        synchronized_output: See :obj:`TerminalFeatures.synchronized_output`.
+
     See Also:
         You are unlikely to create this object yourself, use :func:`terminal` instead.
     """
+    erase_line: bool = True
+    repeat_chars: bool = False
+    synchronized_output: bool = False
+
     def __init__(
         self,
         event_queue: SimpleQueue[InputEvent],
@@ -176,22 +474,80 @@ class TerminalIO(ABC):
     ) -> None:
         self.event_queue = event_queue
         self.stdout: TextIO = stdout
+        self._coalesced_events: deque[InputEvent] = deque()
 
         x, y = self.get_terminal_size()
         self._last_terminal_size = Rect(x, y)
         self._screen = Screen(x, y)
+        self._displayed_screen: Screen | None = None
+        """The screen that the terminal currently shows, used to only redraw changed cells."""
+        self._frame_queued = False
+        """Whether the output of the last frame was not completely written yet."""
+        self._queued_frame_base: Screen | None = None
+        """The screen that the queued frame was diffed against, None if it redraws the whole screen."""
+        self.timings: FrameTimings | None = None
+        """Timings of the last displayed frames, or None if timing is disabled. See :meth:`enable_timing`."""
+        self._on_frame_timing: Callable[[FrameTiming], Any] | None = None
 
     @abstractmethod
     def get_terminal_size(self) -> Rect:
-        """Get terminal size."""
+        """Get terminal size.
+
+        Backends that watch for resizes return a cached size, that is updated
+        before an :obj:`~functui.classes.InputEvent` with a
+        :attr:`~functui.classes.InputEvent.resize_event` is put into the event queue."""
         ...
     @abstractmethod
+    def write(self, ansi_data: str):
+        """Write a string with ansi codes to output without flushing."""
+    def flush(self):
+        """Flush output written with :meth:`write`."""
+        self.stdout.flush()
+
+    def write_frame(self, ansi_data: str):
+        """Write the output of a displayed result without flushing, see :meth:`drop_unstarted_frame`."""
+        self.write(ansi_data)
+
+    def drop_unstarted_frame(self) -> bool:
+        """Discard the output of the last frame if none of it was written yet.
+
+        Returns:
+            Whether the output was discarded, backends that write output
+            immediately never discard it.
+        """
+        return False
+
+    def has_pending_output(self) -> bool:
+        """Whether some output was not written yet, see :obj:`FrameWriter`."""
+        return False
+
+    def wait_for_output(self, timeout: float | None = None):
+        """Block until all output is written, or at most about timeout seconds if it is not None."""
+        self.flush()
+
     def print(self, ansi_data: str):
         """Write a string with ansi codes to output and flush.
 
         See Also:
             For performance reasons, it is recommended to use
             :func:`TerminalIO.display_result` instead."""
+        self.write(ansi_data)
+        self.flush()
+
+    def enable_timing(self, maxlen: int = FRAME_TIMINGS_MAX_SIZE, callback: Callable[[FrameTiming], Any] | None = None):
+        """Start recording how long every phase of :meth:`display_result` takes.
+
+        Args:
+            maxlen: How many frames are remembered in :attr:`timings`.
+            callback: Called with the :obj:`FrameTiming` of every displayed frame,
+                for example to log frames that go over a time budget.
+        """
+        self.timings = FrameTimings(maxlen)
+        self._on_frame_timing = callback
+
+    def disable_timing(self):
+        self.timings = None
+        self._on_frame_timing = None
 
 
     def block_until_input(self, ignore_excess_mouse: bool = True) -> InputEvent:
@@ -200,31 +556,95 @@ class TerminalIO(ABC):
             ignore_excess_mouse:
                 Sometimes ui does not render in time due to an event being
                 emmited for every cell a mouse moves over. In this case,
-                skip over mouse events that we don't have the time to render."""
-
-        # if rendering is taking time and we cant handle every event
-        while self.event_queue.qsize() > 1 and ignore_excess_mouse:
-            event = self.event_queue.get()
-            if event.key_event is not None:
-                return event
-
-        return self.event_queue.get()
+                merge the mouse motion and resize events that arrived while
+                rendering with :func:`coalesce_input_events`. Wheel events
+                are still returned one by one."""
+        if self._coalesced_events:
+            return self._coalesced_events.popleft()
+
+        # finish writing the last frame, unless the user does something first
+        while self.has_pending_output() and self.event_queue.empty():
+            self.wait_for_output(PENDING_OUTPUT_RETRY_INTERVAL)
+
+        event = self.event_queue.get()
+        if not ignore_excess_mouse or self.event_queue.empty():
+            return event
+        # rendering is taking time and we cant handle every event
+        self._coalesced_events.extend(coalesce_input_events([event, *_get_all_queue_items(self.event_queue)], merge_wheel=False))
+        return self._coalesced_events.popleft()
     def display_result(self, res: Result):
         """Display a result generated from a :obj:`functui.classes.Layout`.
 
-        The preffered way to display layouts."""
+        The preffered way to display layouts.
+
+        Only the cells that changed since the last displayed result are
+        redrawn. If the terminal contents were changed by something else, call
+        :meth:`force_redraw` before displaying the next result.
+
+        If the terminal did not start receiving the last frame yet, that frame
+        is discarded and this one is diffed against what the terminal shows,
+        so output does not pile up when results are displayed faster than
+        the terminal accepts them."""
 
         data = res.expect_data(ResultCreatedWith)
+        if self._frame_queued:
+            self._frame_queued = False
+            if self.drop_unstarted_frame():
+                # the terminal still shows the screen the discarded frame was diffed against
+                if self._displayed_screen is not None:
+                    self._screen = self._displayed_screen
+                self._displayed_screen = self._queued_frame_base
+            self._queued_frame_base = None
         # don't recreate the screen unless forced to
         if data.screen_size != self._last_terminal_size:
             self._last_terminal_size = data.screen_size
             self._screen = Screen(*self._last_terminal_size)
+            self._displayed_screen = None
         else:
             self._screen.clear()
 
-        self._screen.apply_draw_commands(data.measure_text_func, res.get_commands()) # 20 %
-        out_str =  _render_ansi(self._screen) # 30 %
-        self.print("\x1b[H" + out_str + "\033[39m\033[49m")
+        timed = self.timings is not None
+        if timed:
+            t0 = perf_counter()
+        self._screen.apply_result(res)
+        if timed:
+            t1 = perf_counter()
+        redraw = self._displayed_screen is None
+        if redraw:
+            out_str = _render_ansi(self._screen, self.erase_line, self.repeat_chars, absolute=True) + ANSI_RESET_STYLES
+            self._displayed_screen = Screen(*self._last_terminal_size)
+        else:
+            out_str = _render_ansi_diff(self._displayed_screen, self._screen, self.erase_line, self.repeat_chars)
+        # double buffering, the old displayed screen is cleared and reused next frame
+        self._screen, self._displayed_screen = self._displayed_screen, self._screen
+        if out_str and self.synchronized_output:
+            out_str = SYNCHRONIZED_OUTPUT_BEGIN + out_str + SYNCHRONIZED_OUTPUT_END
+        if timed:
+            t2 = perf_counter()
+        if out_str:
+            self.write_frame(out_str)
+        if timed:
+            t3 = perf_counter()
+        if out_str:
+            self.flush()
+            if self.has_pending_output():
+                # keep the screen this frame was diffed against in case the frame is discarded
+                self._frame_queued = True
+                if not redraw:
+                    self._queued_frame_base = self._screen
+                    self._screen = Screen(*self._last_terminal_size)
+        if not timed:
+            return
+        t4 = perf_counter()
+        timing = FrameTiming(data.render_time, t1 - t0, t2 - t1, t3 - t2, t4 - t3)
+        self.timings.append(timing)
+        if self._on_frame_timing is not None:
+            self._on_frame_timing(timing)
+
+    def force_redraw(self):
+        """Redraw the whole screen the next time a result is displayed."""
+        self._displayed_screen = None
+        self._queued_frame_base = None
 
 class TerminalContext(ABC):
     def __init__(
@@ -245,25 +665,83 @@ class TerminalContext(ABC):
 
 def _create_reader_thread(stdin: TextIO, queue: SimpleQueue[InputEvent]):
     def _reader_thread():
-        byte_parser = ByteParser()
-        raw_parser = RawInputParser()
+        decoder = InputDecoder()
         while True:
-            input = stdin.buffer.read(1)
-            if raw_event := byte_parser.feed(input[0]):
-                # print(repr(raw_event.data), raw_event.type.name)
-                if event := raw_parser.feed(raw_event):
+            # blocks until some input is available, then returns all of it (up to READ_SIZE bytes)
+            data = stdin.buffer.read1(READ_SIZE) # type: ignore
+            if not data: # end of file
+                return
+            for event in decoder.feed_bytes(data):
+                queue.put(event)
+            if decoder.pending and sys.platform != "win32" and not select.select([stdin.buffer], [], [], ESCAPE_DELAY)[0]:
+                for event in decoder.flush():
                     queue.put(event)
     return threading.Thread(target=_reader_thread, daemon=True)
 
 def _get_all_queue_items[T](queue: SimpleQueue[T]) -> list[T]:
     out = []
     try:
-        item = queue.get_nowait()
-        out.append(item)
+        while True:
+            out.append(queue.get_nowait())
     except Empty:
         pass
     return out
 
+DEFAULT_MAX_FPS = 60
+
+class RenderScheduler:
+    """Collects input events so that an application renders at most ``max_fps`` times per second.
+
+    Instead of rendering after every event, the application renders once and
+    then passes every event returned by :meth:`wait_for_events` through its
+    update function. If the last frame was rendered less than a frame interval
+    ago, events are collected until the interval is over, so a burst of key
+    repeats or mouse motion is folded into a single frame. If the application
+    was idle, events are returned as soon as they arrive.
+
+    Examples:
+        .. code-block:: python
+
+            with terminal() as term:
+                scheduler = RenderScheduler(term)
+                while True:
+                    res = layout_to_result(view(m), term.get_terminal_size())
+                    term.display_result(res)
+
+                    events = scheduler.wait_for_events()
+                    if any(event.key_event == "ctrl+c" for event in events):
+                        break
+                    for event in events:
+                        update(event, res, m)
+    """
+    def __init__(self, term: "TerminalIO", max_fps: float = DEFAULT_MAX_FPS) -> None:
+        self.term = term
+        self.frame_interval = 1 / max_fps
+        self._last_frame = float("-inf")
+
+    @property
+    def max_fps(self) -> float:
+        return 1 / self.frame_interval
+
+    @max_fps.setter
+    def max_fps(self, value: float):
+        self.frame_interval = 1 / value
+
+    def wait_for_events(self) -> list[InputEvent]:
+        """Wait for at least one input event and return every event that arrives until the next frame is due.
+
+        Mouse motion and wheel events are merged with :func:`coalesce_input_events`."""
+        events = [self.term.block_until_input(ignore_excess_mouse=False)]
+        deadline = self._last_frame + self.frame_interval
+        while (remaining := deadline - perf_counter()) > 0:
+            try:
+                events.append(self.term.event_queue.get(timeout=remaining))
+            except Empty:
+                break
+        events.extend(_get_all_queue_items(self.term.event_queue))
+        self._last_frame = perf_counter()
+        return coalesce_input_events(events)
+
 
 
 
@@ -311,7 +789,9 @@ class WindowsTerminalContext(TerminalContext):
         self.reader_thread.start()
 
         set_xterm_features(self.stdout, self.features)
-        return WindowsTerminalIO(event_queue, self.stdout)
+        term = WindowsTerminalIO(event_queue, self.stdout)
+        term.synchronized_output = self.features.synchronized_output
+        return term
 
     def __exit__(self, value, exception, traceback):
         set_xterm_features(self.stdout, DEFAULT_FEATURES)
@@ -326,44 +806,122 @@ class WindowsTerminalContext(TerminalContext):
 
 class WindowsTerminalIO(TerminalIO):
     def get_terminal_size(self) -> Rect:
-        size = shutil.get_terminal_size()
-        return Rect(size.columns, size.lines)
-    def print(self, ansi_data: str):
+        return _read_terminal_size()
+    def write(self, ansi_data: str):
         self.stdout.write(ansi_data)
-        self.stdout.flush()
+
+def _read_terminal_size() -> Rect:
+    size = shutil.get_terminal_size()
+    return Rect(size.columns, size.lines)
+
+RESIZE_DEBOUNCE = 0.05
+"""Seconds to wait for the terminal to stop being resized, before a resize event is sent."""
+
+def _enter_raw_mode(fd: int) -> list:
+    """Put a unix terminal into raw mode and return the attributes needed to restore it."""
+    import termios
+    import tty
+    old_attrs = termios.tcgetattr(fd)
+    tty.setraw(fd)
+    return old_attrs
+
+def _exit_raw_mode(fd: int, old_attrs: list):
+    import termios
+    import tty
+    tty.setcbreak(fd)
+    termios.tcsetattr(fd, termios.TCSANOW, old_attrs)
 
 class UnixTerminalContext(TerminalContext):
     def __enter__(self):
-        # unix specific setup
-        import termios
-        import tty
         self.fd = sys.stdin.fileno()
-        self.old_attrs = termios.tcgetattr(self.fd)
-        tty.setraw(self.fd)
-        # end
+        self.old_attrs = _enter_raw_mode(self.fd)
         event_queue: SimpleQueue[InputEvent] = SimpleQueue()
         self.reader_thread = _create_reader_thread(self.stdin, event_queue)
         self.reader_thread.start()
         set_xterm_features(self.stdout, self.features)
-        return UnixTerminalIO(event_queue, self.stdout)
+        self.term = UnixTerminalIO(event_queue, self.stdout)
+        self.term.synchronized_output = self.features.synchronized_output
+        if threading.current_thread() is threading.main_thread(): # signal handlers can only be set from the main thread
+            self.term.watch_resize()
+        return self.term
 
     def __exit__(self, value, exception, traceback):
+        self.term.stop_watching_resize()
+        self.term.wait_for_output()
         set_xterm_features(self.stdout, DEFAULT_FEATURES)
-        # unix specific cleanup
-        import termios
-        import tty
-        tty.setcbreak(self.fd)
-        termios.tcsetattr(self.fd, termios.TCSANOW, self.old_attrs)
-        # end
+        _exit_raw_mode(self.fd, self.old_attrs)
 
 class UnixTerminalIO(TerminalIO):
+    """Writes to the stdout file descriptor directly, see :obj:`FrameWriter`."""
+    def __init__(self, event_queue: SimpleQueue[InputEvent], stdout: TextIO) -> None:
+        self._size = _read_terminal_size()
+        self._resized = threading.Event()
+        self._old_sigwinch_handler: Any = None
+        self._resize_thread: threading.Thread | None = None
+        super().__init__(event_queue, stdout)
+        stdout.flush()
+        self.writer = FrameWriter(stdout.fileno())
+
     def get_terminal_size(self) -> Rect:
-        size = shutil.get_terminal_size()
-        return Rect(size.columns, size.lines)
-    def print(self, ansi_data: str):
-        ansi_data = "".join(intersperse(ansi_data.split("\n"), sep="\n\r"))
-        self.stdout.write(ansi_data)
-        self.stdout.flush()
+        if self._resize_thread is None:
+            return _read_terminal_size()
+        return self._size
+
+    def watch_resize(self):
+        """Cache the terminal size and update it when the terminal is resized (SIGWINCH).
+
+        After the terminal is resized, an :obj:`~functui.classes.InputEvent`
+        with a :attr:`~functui.classes.InputEvent.resize_event` is put into the
+        event queue. Signals that arrive less than :obj:`RESIZE_DEBOUNCE`
+        seconds apart, like while dragging a window border, cause one event.
+
+        Must be called from the main thread. :obj:`UnixTerminalContext` calls this for you.
+        """
+        if self._resize_thread is not None:
+            return
+        self._size = _read_terminal_size()
+        self._old_sigwinch_handler = signal.signal(signal.SIGWINCH, lambda signum, frame: self._resized.set())
+        self._resize_thread = threading.Thread(target=self._post_resize_events, daemon=True)
+        self._resize_thread.start()
+
+    def stop_watching_resize(self):
+        if self._resize_thread is None:
+            return
+        signal.signal(signal.SIGWINCH, self._old_sigwinch_handler)
+        thread = self._resize_thread
+        self._resize_thread = None
+        self._resized.set()
+        thread.join()
+
+    def _post_resize_events(self):
+        thread = threading.current_thread()
+        while True:
+            self._resized.wait()
+            # wait until no signal arrived for a while
+            while self._resized.is_set():
+                self._resized.clear()
+                self._resized.wait(RESIZE_DEBOUNCE)
+            if self._resize_thread is not thread:
+                return
+            size = _read_terminal_size()
+            if size != self._size:
+                self._size = size
+                self.event_queue.put(InputEvent(resize_event=size))
+    def write(self, ansi_data: str):
+        # displayed results only use absolute cursor moves, raw mode needs \r for other output
+        if "\n" in ansi_data:
+            ansi_data = "".join(intersperse(ansi_data.split("\n"), sep="\n\r"))
+        self.writer.write(ansi_data)
+    def write_frame(self, ansi_data: str):
+        self.writer.write_frame(ansi_data)
+    def drop_unstarted_frame(self) -> bool:
+        return self.writer.drop_unstarted_frame()
+    def flush(self):
+        self.writer.flush()
+    def has_pending_output(self) -> bool:
+        return self.writer.pending > 0
+    def wait_for_output(self, timeout: float | None = None):
+        self.writer.flush(timeout)
 
 
 
@@ -0,0 +1,250 @@
+"""Asyncio version of :obj:`functui.io.raw`, for unix terminals.
+
+Input is read by a reader registered with :meth:`asyncio.loop.add_reader`
+instead of a thread, so the ui can share one event loop with other tasks
+(network clients, timers, ...).
+
+Examples:
+    .. code-block:: python
+
+        import asyncio
+        from functui.io.raw_async import terminal_async
+
+        async def main():
+            async with terminal_async() as term:
+                while True:
+                    res = layout_to_result(view(m), term.get_terminal_size())
+                    await term.display_result(res)
+
+                    events = await term.wait_for_events()
+                    if any(event.key_event == "ctrl+c" for event in events):
+                        break
+                    for event in events:
+                        update(event, res, m)
+
+        asyncio.run(main())
+"""
+import asyncio
+import os
+import signal
+import sys
+from typing import TextIO
+
+from ..classes import InputEvent, Rect, Result
+from .raw import (
+    APPLICATION_MODE_FEATURES, DEFAULT_FEATURES, ESCAPE_DELAY, READ_SIZE, RESIZE_DEBOUNCE, FrameWriter, InputDecoder, TerminalFeatures,
+    TerminalIO, _enter_raw_mode, _exit_raw_mode, _read_terminal_size, coalesce_input_events, set_xterm_features,
+)
+
+__all__ = [
+    'AsyncTerminalContext',
+    'AsyncTerminalIO',
+    'terminal_async',
+]
+
+_END_OF_INPUT = InputEvent()
+"""Put into the event queue after the input was closed, never returned to the user."""
+
+class AsyncTerminalIO(TerminalIO):
+    """Terminal input and output driven by an asyncio event loop.
+
+    Input events can be awaited with :meth:`wait_for_events` or iterated
+    over with ``async for event in term``. After the input is closed,
+    :meth:`wait_for_events` raises :obj:`EOFError` and iteration stops.
+
+    See Also:
+        You are unlikely to create this object yourself, use :func:`terminal_async` instead.
+    """
+    def __init__(self, stdout: TextIO, loop: asyncio.AbstractEventLoop) -> None:
+        self._size = _read_terminal_size()
+        self._resize_handle: asyncio.TimerHandle | None = None
+        self._watching_resize = False
+        event_queue: asyncio.Queue[InputEvent] = asyncio.Queue()
+        super().__init__(event_queue, stdout) # type: ignore
+        self.event_queue: asyncio.Queue[InputEvent] = event_queue # type: ignore
+        stdout.flush()
+        self.loop = loop
+        self.writer = FrameWriter(stdout.fileno())
+        self._input_fd: int | None = None
+        self._decoder = InputDecoder()
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    def get_terminal_size(self) -> Rect:
+        if not self._watching_resize:
+            return _read_terminal_size()
+        return self._size
+
+    def watch_resize(self):
+        """Cache the terminal size and put a resize event into the queue after the terminal is resized.
+
+        See :meth:`functui.io.raw.UnixTerminalIO.watch_resize`.
+        """
+        self._size = _read_terminal_size()
+        self._watching_resize = True
+        self.loop.add_signal_handler(signal.SIGWINCH, self._on_resize_signal)
+
+    def stop_watching_resize(self):
+        if not self._watching_resize:
+            return
+        self._watching_resize = False
+        self.loop.remove_signal_handler(signal.SIGWINCH)
+        if self._resize_handle is not None:
+            self._resize_handle.cancel()
+            self._resize_handle = None
+
+    def _on_resize_signal(self):
+        # wait until no signal arrived for a while
+        if self._resize_handle is not None:
+            self._resize_handle.cancel()
+        self._resize_handle = self.loop.call_later(RESIZE_DEBOUNCE, self._post_resize_event)
+
+    def _post_resize_event(self):
+        self._resize_handle = None
+        size = _read_terminal_size()
+        if size != self._size:
+            self._size = size
+            self.event_queue.put_nowait(InputEvent(resize_event=size))
+
+    def write(self, ansi_data: str):
+        if "\n" in ansi_data: # raw mode needs \r after every newline
+            ansi_data = ansi_data.replace("\n", "\n\r")
+        self.writer.write(ansi_data)
+
+    def write_frame(self, ansi_data: str):
+        self.writer.write_frame(ansi_data)
+
+    def drop_unstarted_frame(self) -> bool:
+        return self.writer.drop_unstarted_frame()
+
+    def flush(self):
+        self.writer.flush()
+
+    def has_pending_output(self) -> bool:
+        return self.writer.pending > 0
+
+    def start_reading(self, fd: int):
+        """Parse input from fd whenever it is readable, until :meth:`stop_reading` is called."""
+        self._input_fd = fd
+        self.loop.add_reader(fd, self._on_readable)
+
+    def stop_reading(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._input_fd is not None:
+            self.loop.remove_reader(self._input_fd)
+            self._input_fd = None
+
+    def _on_readable(self):
+        assert self._input_fd is not None
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        try:
+            data = os.read(self._input_fd, READ_SIZE)
+        except (BlockingIOError, InterruptedError): # woken up without input, wait for the next wake up
+            return
+        if not data: # end of file, the reader would be called again right away
+            self.stop_reading()
+            self._flush_input()
+            self.event_queue.put_nowait(_END_OF_INPUT)
+            return
+        for event in self._decoder.feed_bytes(data):
+            self.event_queue.put_nowait(event)
+        if self._decoder.pending: # a lone escape is the escape key unless more input follows
+            self._flush_handle = self.loop.call_later(ESCAPE_DELAY, self._flush_input)
+
+    def _flush_input(self):
+        self._flush_handle = None
+        for event in self._decoder.flush():
+            self.event_queue.put_nowait(event)
+
+    def block_until_input(self, ignore_excess_mouse: bool = True) -> InputEvent:
+        raise TypeError("Input can not be waited for synchronously, use `await term.wait_for_events()` instead.")
+
+    async def wait_for_events(self) -> list[InputEvent]:
+        """Wait for at least one input event and return it together with every other event that already arrived.
+
+        Mouse motion and wheel events are merged, see :func:`functui.io.raw.coalesce_input_events`.
+
+        Raises:
+            EOFError: The input was closed and every event was already returned.
+        """
+        events = [await self.event_queue.get()]
+        try:
+            while events[-1] is not _END_OF_INPUT:
+                events.append(self.event_queue.get_nowait())
+        except asyncio.QueueEmpty:
+            pass
+        if events[-1] is _END_OF_INPUT:
+            self.event_queue.put_nowait(_END_OF_INPUT) # wake up the next waiter too
+            events.pop()
+            if not events:
+                raise EOFError("terminal input was closed")
+        return coalesce_input_events(events)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> InputEvent:
+        event = await self.event_queue.get()
+        if event is _END_OF_INPUT:
+            self.event_queue.put_nowait(_END_OF_INPUT)
+            raise StopAsyncIteration
+        return event
+
+    async def display_result(self, res: Result): # type: ignore[override]
+        """Display a result, then wait until the terminal accepted all of the output.
+
+        See :meth:`functui.io.raw.TerminalIO.display_result`.
+        """
+        super().display_result(res)
+        await self.drain()
+
+    async def drain(self):
+        """Wait until all output is written, without blocking the event loop."""
+        fd = self.writer.fd
+        while not self.writer.flush():
+            writable = self.loop.create_future()
+            self.loop.add_writer(fd, lambda: writable.done() or writable.set_result(None))
+            try:
+                await writable
+            finally:
+                self.loop.remove_writer(fd)
+
+
+class AsyncTerminalContext:
+    """Async context manager that configures the terminal, see :obj:`functui.io.raw.TerminalContext`."""
+    def __init__(
+        self,
+        features: TerminalFeatures,
+        stdin: TextIO,
+        stdout: TextIO,
+    ) -> None:
+        self.stdin = stdin
+        self.stdout = stdout
+        self.features = features
+
+    async def __aenter__(self) -> AsyncTerminalIO:
+        self.fd = self.stdin.fileno()
+        self.old_attrs = _enter_raw_mode(self.fd)
+        set_xterm_features(self.stdout, self.features)
+        self.term = AsyncTerminalIO(self.stdout, asyncio.get_running_loop())
+        self.term.synchronized_output = self.features.synchronized_output
+        self.term.start_reading(self.fd)
+        self.term.watch_resize()
+        return self.term
+
+    async def __aexit__(self, value, exception, traceback):
+        self.term.stop_watching_resize()
+        self.term.stop_reading()
+        await self.term.drain()
+        set_xterm_features(self.stdout, DEFAULT_FEATURES)
+        _exit_raw_mode(self.fd, self.old_attrs)
+
+
+def terminal_async(features: TerminalFeatures = APPLICATION_MODE_FEATURES) -> AsyncTerminalContext:
+    """Create an :obj:`AsyncTerminalContext`, only unix terminals are supported."""
+    if sys.platform == "win32":
+        raise NotImplementedError("terminal_async is not supported on windows, use functui.io.raw.terminal instead.")
+    return AsyncTerminalContext(features, sys.__stdin__, sys.__stdout__) # type: ignore
@@ -1,10 +1,13 @@
 """Tools to make layouts responsive to keyboard and mouse input"""
 from enum import Enum, auto
-from typing import Self, Literal, Iterable, Any, NamedTuple
+from typing import Self, Literal, Iterable, Any, NamedTuple, Callable, Sequence
 from dataclasses import dataclass, field
 from types import MappingProxyType
 from functools import partial
-from .classes import Coordinate, Result, ResultData, Layout, Frame, Box, Rect, clamp, min_size_horizontal
+from itertools import accumulate
+from bisect import bisect_left, bisect_right
+from .classes import Coordinate, Result, ResultData, Layout, Frame, Box, Rect, clamp, min_size_horizontal, min_size_constant
+from .cache import render_cache
 from .common import vbox, offset, vbar
 
 __all__ = [
@@ -21,9 +24,11 @@ __all__ = [
 
     "NavState",
     "DEFAULT_NAV_BINDINGS",
+    "SCROLL_LINES",
 
     "interaction_area",
     "v_scroll",
+    "virtual_list",
 ]
 
 class NavAction(Enum):
@@ -215,8 +220,21 @@ class _HoveredData(NamedTuple):
 class InteractionAreas(ResultData):
     areas: dict[InteractibleID, BoxData]
     def merge_children(self, child_data):
+        # results may be cached and shared, so the areas must never be modified in place
+        return InteractionAreas({**self.areas, **child_data.areas})
+    def merge_children_in_place(self, child_data):
         self.areas.update(child_data.areas)
         return self
+    def offset_by(self, coordinate):
+        return InteractionAreas({
+            k: BoxData(v.visible_box.offset_by(coordinate), v.actual_box.offset_by(coordinate), v.dragable)
+            for k, v in self.areas.items()
+        })
+    def clipped_to(self, box):
+        return InteractionAreas({
+            k: BoxData(v.visible_box.intersect(box), v.actual_box, v.dragable)
+            for k, v in self.areas.items()
+        })
 
 @dataclass(frozen=True)
 class NavState:
@@ -226,6 +244,8 @@ class NavState:
 
     action: NavAction | None = None
     last_action: NavAction | None = None
+    scroll_delta: int = 0
+    """Mouse wheel steps that caused the last scroll action, see :obj:`~functui.classes.InputEvent.scroll_delta`."""
 
     areas: MappingProxyType[InteractibleID, BoxData] = MappingProxyType({})
     """All areas that were marked by an :obj:`interaction_area` wrapper node."""
@@ -308,11 +328,15 @@ class NavState:
                 return True
         return False
     def get_scrolling_difference(self):
+        """Lines to scroll by, :obj:`SCROLL_LINES` for every step of the mouse wheel.
+
+        A scroll action without a :attr:`scroll_delta` scrolls one step."""
+        steps = abs(self.scroll_delta) or 1
         if self.action == NavAction.SCROLL_UP:
-            return -3
+            return -SCROLL_LINES * steps
 
         if self.action == NavAction.SCROLL_DOWN:
-            return 3
+            return SCROLL_LINES * steps
 
         return 0
     def get_mouse_drag_difference(self) -> Coordinate:
@@ -324,6 +348,7 @@ class NavState:
             action: NavAction | None = None,
             nav_tree: list[InteractibleID] | None = None,
             mouse_position: Coordinate | None = None,
+            scroll_delta: int = 0,
     ):
         """Create a new NavState based on data and user input.
 
@@ -334,6 +359,7 @@ class NavState:
                 The keyboard navigation tree that is used to perform keyboard
                 navigation based on the action. InteractibleID's must be defined in order.
             mouse_position: Mouse position.
+            scroll_delta: Mouse wheel steps of a scroll action, see :obj:`~functui.classes.InputEvent.scroll_delta`.
         Returns:
             A new NavState with keyboard navigation and mouse interactivity performed.
         """
@@ -423,6 +449,7 @@ class NavState:
             last_mouse_position=self.mouse_position,
             action=action,
             last_action=self.action,
+            scroll_delta=scroll_delta,
             areas=areas,
             _active_id=next_active_id,
             _hovered_data=next_hovered_data,
@@ -632,11 +659,18 @@ DEFAULT_NAV_BINDINGS = {
 }
 """A dictinary that maps the string representation of keycodes to a :obj:`NavAction`"""
 
+SCROLL_LINES = 3
+"""Lines scrolled per step of the mouse wheel."""
+
 
 class _NewActiveBox(NamedTuple):
     box: Box
     reverse: bool = False
 
+class _FindActive(NamedTuple):
+    id: InteractibleID
+    reverse: bool = False
+
 def v_scroll(container_id: InteractibleID, nav: NavState):
     """Allow vertical scrolling if child does not fit into available space."""
     def _v_scroll(child: Layout):
@@ -647,11 +681,15 @@ def v_scroll(container_id: InteractibleID, nav: NavState):
 
         # find active box
         active_box = None
-        if (_active_box := nav.areas.get(nav.active_id, None)) is not None\
-            and nav.action in KEYBOARD_NAV_ACTION\
+        find_active = None
+        if nav.action in KEYBOARD_NAV_ACTION\
             and nav.active_id.data[:len(container_id.data)] == container_id.data:
             # ^^^^^^^^ if active_id is a child of container_id
-            active_box = _NewActiveBox(_active_box.actual_box, nav.action == NavAction.NAV_UP)
+            if (_active_box := nav.areas.get(nav.active_id, None)) is not None:
+                active_box = _NewActiveBox(_active_box.actual_box, nav.action == NavAction.NAV_UP)
+            else:
+                # the active child was culled from the last frame (see visible_children), find it while rendering
+                find_active = _FindActive(nav.active_id, nav.action == NavAction.NAV_UP)
 
 
         at_y += nav.get_scrolling_difference()
@@ -663,6 +701,7 @@ def v_scroll(container_id: InteractibleID, nav: NavState):
                 _v_scroll_render,
                 at_y,
                 active_box,
+                find_active,
                 container_id,
                 child,
             )
@@ -672,11 +711,14 @@ def v_scroll(container_id: InteractibleID, nav: NavState):
 def _v_scroll_render(
     scroll_dy: int,
     active_box: _NewActiveBox | None,
+    find_active: _FindActive | None,
     container_id: InteractibleID,
     child: Layout,
     frame: Frame, 
     box: Box
 ):
+    if find_active is not None:
+        active_box = _find_active_box(find_active, scroll_dy, child, frame, box)
     # move to selected if selected out of bounds
     a = []
     if active_box is not None:
@@ -712,6 +754,132 @@ def _v_scroll_render(
     res.add_children_after([modified_child.render(frame, box)])
     return res
 
+def _find_active_box(find_active: _FindActive, scroll_dy: int, child: Layout, frame: Frame, box: Box) -> _NewActiveBox | None:
+    """Find where the active interactible is, when it was culled from the last frame.
+
+    The child is rendered with a view box that doubles in height around the
+    visible part until the interactible has an area. Containers still cull
+    everything outside of that view box, so the cost grows with the distance
+    to the interactible instead of with the size of the child. Only if the
+    interactible is not found at all is the whole child rendered, once.
+    """
+    height = child.min_size(frame.measure_text, Rect(box.width, 9999)).height
+    child_box = Box(box.width, height).offset_by(box.position + Coordinate(0, -scroll_dy))
+    margin = max(box.height, 1)
+    while True:
+        view_box = Box(box.width, box.height + 2 * margin, box.position + Coordinate(0, -margin)).intersect(child_box)
+        areas = child.render(frame.with_view_box(view_box), child_box).try_data(InteractionAreas)
+        if areas is not None and (data := areas.areas.get(find_active.id)) is not None:
+            return _NewActiveBox(data.actual_box, find_active.reverse)
+        if view_box == child_box:
+            return None
+        margin *= 2
+
+def virtual_list(
+    count: int,
+    item_height: int | Callable[[int], int],
+    build_item: Callable[[int], Layout],
+    container_id: InteractibleID | None = None,
+    nav: NavState | None = None,
+    min_width: int = 0,
+) -> Layout:
+    """A vertical list that only builds the items that are visible.
+
+    Behaves like a :obj:`~functui.common.vbox` of ``build_item(i)`` for every
+    index, but ``build_item`` is only called for items that intersect the
+    view box (and the item right before and after them), so lists with
+    millions of items can be scrolled with :obj:`v_scroll`. Item heights are
+    given up front, so the visible items are found with a binary search.
+    Unlike a vbox, the width of the items is not measured, the list is as
+    wide as its parent gives it and reports ``min_width`` as its minimum width.
+    For the layout to be cached between frames, ``build_item`` and
+    ``item_height`` must be the same objects every frame, because functions
+    are compared by identity. Use module level functions, or create a
+    :obj:`functools.partial` or closure once and reuse it instead of
+    creating it in ``view``.
+
+    Args:
+        count: Number of items.
+        item_height: Height of every item, or a function that returns the height of the item at an index.
+        build_item: Function that returns the layout of the item at an index.
+        container_id:
+            If given, item ``i`` is wrapped in an :obj:`interaction_area`
+            with the id ``container_id.child(i)``.
+        nav:
+            If given along with ``container_id``, the keyboard-active item
+            and its neighbours always get an interaction area, even when they
+            are off screen. This lets :obj:`v_scroll` scroll to them.
+        min_width:
+            Minimum width of the list, for containers that size their
+            children by minimum width like :obj:`~functui.common.hbox`.
+
+    Examples:
+        >>> from functui import Rect, layout_to_str
+        >>> from functui.common import text
+        >>> layout = virtual_list(500_000, 1, lambda i: text(f"entry {i}"))
+        >>> print(layout_to_str(layout | v_scroll(ROOT_VERTICAL, NavState()), Rect(12, 2)))
+        entry 0     
+        entry 1     
+    """
+    active_index = None
+    if container_id is not None and nav is not None:
+        active_data = nav.active_id.data
+        if len(active_data) > len(container_id.data) and active_data[:len(container_id.data)] == container_id.data:
+            active_index = active_data[len(container_id.data)].local_id
+    offsets = _virtual_list_offsets(count, item_height)
+    return Layout(
+        func=virtual_list,
+        min_size=min_size_constant(Rect(min_width, offsets[-1])),
+        render=partial(_virtual_list_render, count, item_height, build_item, container_id, active_index)
+    )
+
+@render_cache(maxsize=16)
+def _virtual_list_offsets(count: int, item_height: int | Callable[[int], int]) -> Sequence[int]:
+    # offsets[i] is where item i starts, offsets[count] is the height of the whole list
+    if isinstance(item_height, int):
+        return range(0, (count + 1) * item_height, item_height) if item_height else (0,) * (count + 1)
+    return (0, *accumulate(map(item_height, range(count))))
+
+@render_cache(translate=True)
+def _virtual_list_render(
+    count: int,
+    item_height: int | Callable[[int], int],
+    build_item: Callable[[int], Layout],
+    container_id: InteractibleID | None,
+    active_index: int | None,
+    frame: Frame,
+    box: Box,
+) -> Result:
+    offsets = _virtual_list_offsets(count, item_height)
+    def item_box(i: int) -> Box:
+        return Box(box.width, offsets[i + 1] - offsets[i], box.position + Coordinate(0, offsets[i]))
+
+    # visible items, and one more on each side
+    view_start = frame.view_box.position.y - box.position.y
+    view_end = view_start + frame.view_box.height
+    first = max(bisect_right(offsets, view_start) - 2, 0)
+    end = min(bisect_left(offsets, view_end) + 1, count)
+
+    res = Result()
+    for i in range(first, end):
+        child_box = item_box(i)
+        item = build_item(i)
+        if container_id is not None:
+            item = interaction_area(container_id.child(i))(item)
+        res.add_children_after([item.render(frame.shrink_to(child_box.intersect(box)), child_box)])
+
+    if container_id is not None and active_index is not None:
+        areas = {}
+        for i in (active_index - 1, active_index, active_index + 1):
+            if 0 <= i < count and not first <= i < end:
+                child_box = item_box(i)
+                areas[container_id.child(i)] = BoxData(frame.view_box.intersect(child_box), child_box, False)
+        if areas:
+            off_screen = Result()
+            off_screen.set_data(InteractionAreas(areas))
+            res.add_children_after([off_screen])
+    return res
+
 @dataclass(frozen=True, eq=True)
 class ResizableSplitData:
     at: int
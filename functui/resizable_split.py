@@ -16,7 +16,12 @@ class ResizableSplitAction(Enum):
 class ResizableSplitResultData(ResultData):
     id_to_data: dict[int, tuple[int,int, Box]]
     def merge_children(self, child_data):
-        return ResizableSplitResultData({**self.id_to_data, **child_data.id_to_width})
+        return ResizableSplitResultData({**self.id_to_data, **child_data.id_to_data})
+    def offset_by(self, coordinate):
+        return ResizableSplitResultData({
+            k: (split_at, width, split_box.offset_by(coordinate))
+            for k, (split_at, width, split_box) in self.id_to_data.items()
+        })
 
 def _v_resizable_split_render(
         left: Layout,
@@ -1,13 +1,16 @@
-from functools import reduce, partial, lru_cache, cache
+from functools import reduce, partial
 from enum import Enum, auto
 from typing import NamedTuple, Iterable, Self, Callable
 from dataclasses import dataclass
 from itertools import chain
+from bisect import bisect_right
 import re
 import math
 
 
 from .classes import *
+from .cache import render_cache
+from .text_width import prefix_widths
 
 
 # This is a mess, but if it works, dont fix it.
@@ -63,26 +66,18 @@ class Group:
 
             # handle overflowing segmend
             del overflowing_segments[0]
-            allowed_letters = []
-            overflowing_letters = list(segment.text)
-            total_letter_length = 0
-
-            for i, letter in enumerate(segment.text):
-                letter_len = measure_text(letter)
-                if total_length + total_letter_length + letter_len <= max_width:
-                    allowed_letters.append(letter)
-                    del overflowing_letters[0]
-                    total_letter_length += letter_len
-                    continue
-
-            if allowed_letters:
+            widths = prefix_widths(segment.text, measure_text)
+            fitting = max(bisect_right(widths, max_width - total_length) - 1, 0)
+            total_letter_length = widths[fitting]
+
+            if fitting:
                 allowed_segments.append(
-                    Segment("".join(allowed_letters), segment.rule, total_letter_length)
+                    Segment(segment.text[:fitting], segment.rule, total_letter_length)
                 )
             overflowing_segments.insert(
                 0, 
                 Segment(
-                    "".join(overflowing_letters),
+                    segment.text[fitting:],
                     segment.rule,
                     segment.length - total_letter_length
                 )
@@ -121,7 +116,7 @@ def rich_text(*string: Span | str):
         render=partial(_rich_text_render, span),
     )
 
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _rich_text_render(span: Span, frame: Frame, box: Box):
     if box.width <= 4:
         return Result()
@@ -172,7 +167,7 @@ def adaptive_text(*string: Span | str, justify=Justify.LEFT, soft_hyphen: str =
 
 
 
-@lru_cache(LRU_MAX_SIZE)
+@render_cache(translate=True)
 def _adaptive_text_render(span: Span, justify: Justify, soft_hyphen: str, frame: Frame, box: Box):
     if box.width <= 1:
         return Result()
@@ -201,7 +196,7 @@ def _adaptive_text_render(span: Span, justify: Justify, soft_hyphen: str, frame:
 
 
 # adaptive_text("hej", span("hej", fg=Color.RED), "hejsan guys\n")
-@cache
+@render_cache(maxsize=4096)
 def _split_by_spaces(s: str, rule: StyleRule, measure_text: MeasureTextFunc):
     r = filter(lambda x: x!='',re.split(r'(\s+)', s))
     return [Segment(t, rule, measure_text(t)) for t in r]
@@ -216,7 +211,7 @@ def _extend_line_with_segments(line: list[Group], segments: list[Segment]):
     for s in segments:
         _append_segment_to_line(line, s)
 
-@cache
+@render_cache(maxsize=1024)
 def _span_to_lines(span: Span, measure_text: MeasureTextFunc) -> list[list[Group]]:
     out_lines = [[]]
     for t in span.text:
@@ -0,0 +1,72 @@
+"""Measuring the width of text in terminal cells.
+
+:func:`text_width` is the default :obj:`functui.classes.MeasureTextFunc`.
+Printable ascii text is measured without any lookups, other text is
+measured with :func:`wcwidth.wcswidth` and cached.
+
+Examples:
+    >>> text_width("hello"), text_width("日本")
+    (5, 4)
+    >>> list(prefix_widths("a日b"))
+    [0, 1, 3, 4]
+"""
+from typing import Callable, Sequence
+import wcwidth
+
+from .cache import render_cache
+
+__all__ = [
+    'TEXT_WIDTH_CACHE_MAX_SIZE',
+    'char_width',
+    'prefix_widths',
+    'text_width',
+]
+
+TEXT_WIDTH_CACHE_MAX_SIZE = 4096
+"""How many non ascii strings (and prefix widths) are remembered by default."""
+
+# widths of all single codepoint strings measured so far, filled in up front for latin-1
+_char_widths: dict[str, int] = {chr(i): wcwidth.wcwidth(chr(i)) for i in range(256)}
+
+
+def char_width(char: str) -> int:
+    """Width of a single character, as returned by :func:`wcwidth.wcwidth`."""
+    try:
+        return _char_widths[char]
+    except KeyError:
+        width = _char_widths[char] = wcwidth.wcwidth(char)
+        return width
+
+
+@render_cache(maxsize=TEXT_WIDTH_CACHE_MAX_SIZE)
+def _wcswidth(text: str) -> int:
+    return wcwidth.wcswidth(text)
+
+def text_width(text: str) -> int:
+    """Width of text, as returned by :func:`wcwidth.wcswidth`."""
+    if text.isascii() and text.isprintable():
+        return len(text)
+    return _wcswidth(text)
+
+
+@render_cache(maxsize=TEXT_WIDTH_CACHE_MAX_SIZE)
+def _prefix_widths(text: str, measure_text: Callable[[str], int]) -> tuple[int, ...]:
+    measure_char = char_width if measure_text is text_width else measure_text
+    total = 0
+    out = [0]
+    for char in text:
+        total += max(measure_char(char), 0)
+        out.append(total)
+    return tuple(out)
+
+def prefix_widths(text: str, measure_text: Callable[[str], int] = text_width) -> Sequence[int]:
+    """Column offset of every character in text, followed by the width of the whole text.
+
+    Characters are measured one by one with measure_text, characters with
+    negative width (control characters) are counted as zero wide. The
+    offsets never decrease, so they can be searched with :mod:`bisect`
+    to find which characters fit within some width.
+    """
+    if measure_text is len or (measure_text is text_width and text.isascii() and text.isprintable()):
+        return range(len(text) + 1)
+    return _prefix_widths(text, measure_text)
@@ -0,0 +1,64 @@
+from functui.classes import Screen, Pixel, Coordinate, CharType, ComputedStyle, Color4
+from functui.classes import StyleAttr, rgb
+from functui.io import ansi
+from functui.io.ansi import _render_ansi, _render_ansi_diff, _changed_runs, _style_transition
+
+
+def test_diff_unchanged_screen_is_empty():
+    assert _render_ansi_diff(Screen(5, 3), Screen(5, 3)) == ""
+
+def test_diff_only_emits_changed_cells():
+    previous = Screen(10, 3)
+    screen = Screen(10, 3)
+    screen.set(Coordinate(4, 1), Pixel("x"))
+    assert _render_ansi_diff(previous, screen) == "\033[2;5Hx\033[0m"
+
+def test_diff_styles_changed_cells():
+    previous = Screen(10, 3)
+    screen = Screen(10, 3)
+    screen.set(Coordinate(0, 0), Pixel("x", style=ComputedStyle(fg=Color4.RED)))
+    out = _render_ansi_diff(previous, screen)
+    assert out.startswith("\033[1;1H")
+    assert "x" in out
+    assert out.endswith("\033[0m")
+
+def test_changed_runs_merge_small_gaps():
+    previous = Screen(20, 1)
+    screen = Screen(20, 1)
+    screen.set(Coordinate(2, 0), Pixel("a"))
+    screen.set(Coordinate(4, 0), Pixel("b"))
+    screen.set(Coordinate(15, 0), Pixel("c"))
+    assert _changed_runs(previous, screen, 0) == [(2, 5), (15, 16)]
+
+def test_changed_runs_do_not_split_wide_chars():
+    previous = Screen(6, 1)
+    screen = Screen(6, 1)
+    for s, char in ((previous, "か"), (screen, "お")):
+        s.set(Coordinate(2, 0), Pixel(char, CharType.WIDE_HEAD))
+        s.set(Coordinate(3, 0), Pixel("", CharType.WIDE_TAIL))
+    assert _changed_runs(previous, screen, 0) == [(2, 4)]
+
+def test_style_transitions_are_combined_and_short():
+    red_bold = ComputedStyle(fg=Color4.RED, attrs=StyleAttr.BOLD)
+    assert _style_transition(ComputedStyle(), red_bold) == "\033[1;31m"
+    assert _style_transition(red_bold, ComputedStyle(fg=Color4.BRIGHT_RED, bg=Color4.BLUE)) == "\033[0;91;44m"
+    assert _style_transition(ComputedStyle(), ComputedStyle(fg=200, bg=rgb(1, 2, 3))) == "\033[38;5;200;48;2;1;2;3m"
+    # turning off bold also turns off dim
+    dim_bold = ComputedStyle(fg=Color4.RED, attrs=StyleAttr.BOLD | StyleAttr.DIM)
+    assert _style_transition(dim_bold, ComputedStyle(fg=Color4.RED, attrs=StyleAttr.DIM)) == "\033[22;2m"
+
+def test_style_transitions_are_bounded(monkeypatch):
+    monkeypatch.setattr(ansi, "STYLE_TRANSITIONS_MAX_SIZE", 8)
+    screen = Screen(20, 1)
+    for x in range(20):
+        screen.set(Coordinate(x, 0), Pixel("x", style=ComputedStyle(fg=rgb(x, 0, 0))))
+    assert _render_ansi(screen).endswith("\033[38;2;19;0;0mx")
+    assert len(ansi._transitions) <= 8
+
+def test_render_erases_blank_line_ends_and_repeats_chars():
+    screen = Screen(20, 2)
+    for x in range(10):
+        screen.set(Coordinate(x, 0), Pixel("-"))
+    screen.set(Coordinate(0, 1), Pixel("x", style=ComputedStyle(bg=Color4.RED)))
+    assert _render_ansi(screen) == "-" * 10 + " " * 10 + "\n\033[41mx\033[0m" + " " * 19
+    assert _render_ansi(screen, erase_line=True, repeat=True) == "-\033[9b\033[K\n\033[41mx\033[0m\033[K"
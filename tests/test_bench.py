@@ -0,0 +1,27 @@
+import json
+
+from functui.bench import Scenario, STAGES, compare, run_scenarios, main
+from functui.common import text, border
+from functui.classes import Rect
+
+
+def test_run_scenarios_times_every_stage():
+    report = run_scenarios([Scenario("tiny", lambda: text("hej") | border, Rect(10, 3))], repeat=2, cold=True)
+    assert set(report["scenarios"]["tiny"]) == set(STAGES)
+    assert all(t["min"] <= t["median"] for t in report["scenarios"]["tiny"].values())
+
+def test_compare_reports_slower_stages():
+    def report(ms):
+        return {"scenarios": {"a": {"view": {"median": ms, "min": ms}}, "b": {}}}
+    assert compare(report(1.0), report(1.1)) == []
+    (regression,) = compare(report(1.0), report(2.0))
+    assert (regression.scenario, regression.stage, regression.ratio) == ("a", "view", 2.0)
+
+def test_main_exits_with_error_on_regression(tmp_path):
+    path = tmp_path / "baseline.json"
+    assert main(["-k", "deep_borders", "-n", "1", "--save", str(path)]) == 0
+    baseline = json.loads(path.read_text())
+    for stage in baseline["scenarios"]["deep_borders"].values():
+        stage["median"] = 0.0
+    path.write_text(json.dumps(baseline))
+    assert main(["-k", "deep_borders", "-n", "1", "--baseline", str(path)]) == 1
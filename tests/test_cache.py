@@ -1,5 +1,5 @@
 from functui.common import text, border, vbox, _border_render, _text_render, _vbox_render
-from functui.text_wrapping import span, adaptive_text, _adaptive_text_render
+from functui.rich_text import span, adaptive_text, _adaptive_text_render
 from functui.classes import layout_to_result, Rect, StyleRule, Color4
 
 def text_cach_text():
@@ -49,18 +49,19 @@ def test_cache_vbox():
     assert _vbox_render.cache_info().hits == 0
     assert _vbox_render.cache_info().misses == 1
     assert _vbox_render.cache_info().currsize == 1
-    assert _text_render.cache_info().hits == 0
-    assert _text_render.cache_info().misses == 2
-    assert _text_render.cache_info().currsize == 2
+    # renders are cached independently of position, so the second text is a hit
+    assert _text_render.cache_info().hits == 1
+    assert _text_render.cache_info().misses == 1
+    assert _text_render.cache_info().currsize == 1
 
     layout = vbox([text("hej"), text("hej")])
     layout_to_result(layout, Rect(10, 10))
     assert _vbox_render.cache_info().hits == 1
     assert _vbox_render.cache_info().misses == 1
     assert _vbox_render.cache_info().currsize == 1
-    assert _text_render.cache_info().hits == 0
-    assert _text_render.cache_info().misses == 2
-    assert _text_render.cache_info().currsize == 2
+    assert _text_render.cache_info().hits == 1
+    assert _text_render.cache_info().misses == 1
+    assert _text_render.cache_info().currsize == 1
 
     # slightly different layout
     layout = vbox([text("hej"), text("foo")])
@@ -68,9 +69,23 @@ def test_cache_vbox():
     assert _vbox_render.cache_info().hits == 1
     assert _vbox_render.cache_info().misses == 2
     assert _vbox_render.cache_info().currsize == 2
-    assert _text_render.cache_info().hits == 1
-    assert _text_render.cache_info().misses == 3
-    assert _text_render.cache_info().currsize == 3
+    assert _text_render.cache_info().hits == 2
+    assert _text_render.cache_info().misses == 2
+    assert _text_render.cache_info().currsize == 2
+
+def test_cache_is_independent_of_position():
+    _border_render.cache_clear()
+    for at_y in range(5):
+        layout_to_result(vbox([text("hej") | border], at_y=at_y), Rect(10, 10))
+    assert _border_render.cache_info().misses == 1
+    assert _border_render.cache_info().hits == 4
+
+def test_deferred_clipping_caches_partially_visible_nodes_once():
+    _border_render.cache_clear()
+    for at_y in range(-2, 3):
+        layout_to_result(vbox([text("hej") | border], at_y=at_y), Rect(10, 10), defer_clipping=True)
+    assert _border_render.cache_info().misses == 1
+    assert _border_render.cache_info().hits == 4
 
 def test_cache_adaptive_text():
     _adaptive_text_render.cache_clear()
@@ -94,3 +109,61 @@ def test_cache_adaptive_text():
     assert _adaptive_text_render.cache_info().currsize == 2
 
 
+
+def test_render_cache_budgets():
+    from functui.cache import render_cache, next_frame
+
+    @render_cache(name="tests.double", maxsize=2)
+    def double(n):
+        return n * 2
+
+    double(1); double(2); double(1); double(3)
+    assert double.cache_info().currsize == 2
+    assert double.evictions == 1
+    double(1)
+    assert double.cache_info().hits == 2 # 2 was evicted, 1 was kept
+
+    double.resize(maxsize=None, max_age=1)
+    double(4)
+    next_frame()
+    double(4)
+    next_frame()
+    next_frame()
+    assert double.cache_info().currsize == 0
+
+def test_render_cache_weight_and_clear_all():
+    from functui.cache import render_cache, clear_all, get_cache
+
+    @render_cache(name="tests.repeat", max_weight=5, weight=len)
+    def repeat(s, n):
+        return s * n
+
+    repeat("a", 3); repeat("b", 2)
+    assert repeat.currweight == 5
+    repeat("c", 1)
+    assert repeat.cache_info().currsize == 2
+    assert repeat([1], 2) == [1, 1] # unhashable arguments are not cached
+
+    assert get_cache("tests.repeat") is repeat
+    clear_all()
+    assert repeat.cache_info() == (0, 0, 512, 0)
+    assert _text_render.cache_info().currsize == 0
+
+def test_profile_renders():
+    from functui.cache import profile_renders, clear_all
+    clear_all()
+    with profile_renders() as profile:
+        layout_to_result(vbox([text("a"), text("b")]) | border, Rect(10, 10))
+        layout_to_result(vbox([text("a"), text("c")]) | border, Rect(10, 10))
+    layout_to_result(text("d"), Rect(10, 10))
+
+    assert len(profile.frames) == 2
+    first, second = profile.frames
+    assert first.caches["functui.common._text_render"].misses == 2
+    assert second.caches["functui.common._text_render"].misses == 1
+    assert second.caches["functui.common._text_render"].hits == 1
+    assert first.min_size_calls > 0
+    assert first.caches["functui.common._vbox_render"].time > 0
+    total = profile.total()
+    assert total.caches["functui.common._text_render"].misses == 3
+    assert "functui.common._border_render" in total.format_table()
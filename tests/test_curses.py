@@ -0,0 +1,47 @@
+import curses
+
+from functui.classes import Color4, Rect, layout_to_result
+from functui.common import fg, hbox, text
+from functui.io.curses import ColorPairAllocator, CursesPresenter
+
+
+class _FakeWindow:
+    def __init__(self):
+        self.calls = []
+    def erase(self):
+        self.calls.append("erase")
+    def addstr(self, y, x, text, attr):
+        self.calls.append((y, x, text, attr))
+    def noutrefresh(self):
+        pass
+
+def _presenter(monkeypatch, max_pairs=255):
+    monkeypatch.setattr(curses, "color_pair", lambda pair: pair << 8)
+    monkeypatch.setattr(curses, "doupdate", lambda: None)
+    window = _FakeWindow()
+    return window, CursesPresenter(window, ColorPairAllocator(max_pairs, init_pair=lambda *args: None)) # type: ignore
+
+def test_presenter_only_redraws_changed_runs(monkeypatch):
+    window, presenter = _presenter(monkeypatch)
+    presenter.draw(layout_to_result(hbox([text("ab"), text("cd") | fg(Color4.RED)]), Rect(6, 2)))
+    assert window.calls == ["erase", (0, 0, "ab", 0), (0, 2, "cd", 1 << 8)]
+
+    window.calls.clear()
+    presenter.draw(layout_to_result(hbox([text("ab"), text("cx") | fg(Color4.RED)]), Rect(6, 2)))
+    assert window.calls == [(0, 3, "x", 1 << 8)]
+
+    window.calls.clear()
+    presenter.draw(layout_to_result(hbox([text("ab"), text("cx") | fg(Color4.RED)]), Rect(6, 2)))
+    assert window.calls == []
+
+def test_color_pairs_are_recycled_least_recently_used_first():
+    defined = []
+    pairs = ColorPairAllocator(max_pairs=2, init_pair=lambda *args: defined.append(args))
+    assert [pairs.pair(c, -1) for c in (1, 2, 1, 3, 1, 2)] == [1, 2, 1, 2, 1, 2]
+    assert defined == [(1, 1, -1), (2, 2, -1), (2, 3, -1), (2, 2, -1)]
+
+def test_pairs_of_one_frame_do_not_recycle_each_other():
+    pairs = ColorPairAllocator(max_pairs=2, init_pair=lambda *args: None)
+    assert pairs.pair(1, -1) == 1 and pairs.pair(2, -1) == 2
+    frame = pairs.pairs([(3, -1), (1, -1), (-1, -1)])
+    assert frame == {(1, -1): 1, (3, -1): 2, (-1, -1): 0}
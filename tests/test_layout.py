@@ -0,0 +1,94 @@
+from functui.classes import Layout, Rect, Result, min_size_constant
+from functui.common import text, border, vbox, min_width, nothing
+from functools import partial
+
+
+def test_equal_layouts_are_interned():
+    assert vbox([text("a"), text("b")]) | border is vbox([text("a"), text("b")]) | border
+    assert nothing() is nothing()
+
+def test_different_layouts_are_not_equal():
+    assert text("a") != text("b")
+    assert text("a") | border != text("a")
+    assert min_width(3)(text("a")) != min_width(5)(text("a"))
+
+def _list_render(items: list, frame, box):
+    return Result()
+
+def test_unhashable_arguments_fall_back_to_structural_equality():
+    a = Layout(func=_list_render, min_size=min_size_constant(Rect(0, 0)), render=partial(_list_render, [1, 2]))
+    b = Layout(func=_list_render, min_size=min_size_constant(Rect(0, 0)), render=partial(_list_render, [1, 2]))
+    c = Layout(func=_list_render, min_size=min_size_constant(Rect(0, 0)), render=partial(_list_render, [3]))
+    assert a is not b
+    assert a == b and hash(a) == hash(b)
+    assert a != c
+
+def test_min_size_is_cached():
+    calls = []
+    def min_size(measure_text, rect):
+        calls.append(rect)
+        return Rect(1, 1)
+    layout = Layout(func=test_min_size_is_cached, min_size=min_size, render=partial(_list_render, ()))
+    assert layout.min_size(len, Rect(10, 10)) == Rect(1, 1)
+    assert layout.min_size(len, Rect(10, 10)) == Rect(1, 1)
+    assert layout.min_size(len, Rect(5, 10)) == Rect(1, 1)
+    assert calls == [Rect(10, 10), Rect(5, 10)]
+
+def test_vbox_only_renders_visible_children():
+    from functui.classes import layout_to_result
+    from functui.nav import interaction_area, InteractionAreas, ROOT_VERTICAL
+    from functui.common import vbox, text
+    ids = [ROOT_VERTICAL.child(i) for i in range(1000)]
+    layout = vbox([interaction_area(i)(text(str(n))) for n, i in enumerate(ids)], at_y=-10)
+    res = layout_to_result(layout, Rect(5, 5))
+    # the visible rows and one row on each side of them
+    assert list(res.expect_data(InteractionAreas).areas) == ids[9:16]
+
+def test_v_scroll_scrolls_to_an_active_child_that_was_culled():
+    from functui.classes import layout_to_result
+    from functui.nav import interaction_area, v_scroll, NavState, NavAction, ROOT_VERTICAL
+    container = ROOT_VERTICAL.child(0)
+    ids = [container.child(i) for i in range(40)]
+    def view(nav: NavState):
+        return vbox([interaction_area(id)(text(f"item {n}")) for n, id in enumerate(ids)]) | v_scroll(container, nav)
+
+    nav = NavState()
+    res = layout_to_result(view(nav), Rect(10, 5))
+    for action in [NavAction.NAV_DOWN, *[NavAction.SCROLL_DOWN] * 8, NavAction.NAV_DOWN]:
+        nav = nav.update(res, action, ids, scroll_delta=1)
+        res = layout_to_result(view(nav), Rect(10, 5))
+        nav = nav.update(res, None, ids)
+        if action == NavAction.SCROLL_DOWN:
+            assert ids[1] not in nav.areas
+    assert nav.active_id == ids[1]
+    assert nav.try_state(container, int) == 0
+
+_rendered_items = []
+def _counted_item_render(n, frame, box):
+    _rendered_items.append(n)
+    return text(f"item {n}").render(frame, box)
+
+def _counted_item(n):
+    return Layout(func=_counted_item, min_size=min_size_constant(Rect(10, 1)), render=partial(_counted_item_render, n))
+
+def test_finding_a_culled_active_child_does_not_render_the_whole_list():
+    from functui.classes import layout_to_result
+    from functui.nav import interaction_area, v_scroll, NavState, NavAction, ROOT_VERTICAL
+    container = ROOT_VERTICAL.child(0)
+    ids = [container.child(i) for i in range(5000)]
+    def view(nav: NavState):
+        return vbox([interaction_area(id)(_counted_item(n)) for n, id in enumerate(ids)]) | v_scroll(container, nav)
+
+    nav = NavState()
+    res = layout_to_result(view(nav), Rect(10, 5))
+    for action in [NavAction.NAV_DOWN, *[NavAction.SCROLL_DOWN] * 8]:
+        nav = nav.update(res, action, ids, scroll_delta=1)
+        res = layout_to_result(view(nav), Rect(10, 5))
+        nav = nav.update(res, None, ids)
+    nav = nav.update(res, NavAction.NAV_DOWN, ids)
+    _rendered_items.clear()
+    res = layout_to_result(view(nav), Rect(10, 5))
+    nav = nav.update(res, None, ids)
+    assert nav.active_id == ids[1]
+    assert nav.try_state(container, int) == 0
+    assert len(_rendered_items) < 500 # the list has 5000 items
@@ -0,0 +1,66 @@
+import asyncio
+import os
+
+import pytest
+
+from functui.classes import Rect, layout_to_result
+from functui.common import text
+from functui.io.raw_async import AsyncTerminalIO
+
+
+def test_events_are_read_by_the_event_loop_and_output_is_drained():
+    async def main():
+        input_read, input_write = os.pipe()
+        output_read, output_write = os.pipe()
+        stdout = os.fdopen(output_write, "w")
+        term = AsyncTerminalIO(stdout, asyncio.get_running_loop())
+        term.start_reading(input_read)
+        try:
+            os.write(input_write, b"a\x1b[Ab")
+            events = await term.wait_for_events()
+            while len(events) < 3:
+                events += await term.wait_for_events()
+            assert [event.key_event for event in events] == ["a", "up", "b"]
+
+            # bigger than a pipe, so display_result has to wait for the reader
+            big = layout_to_result(text("x" * 300_000), Rect(300_000, 1))
+            reader = asyncio.get_running_loop().run_in_executor(None, _read_until, output_read, b"x" * 300_000)
+            await term.display_result(big)
+            assert term.writer.pending == 0
+            await reader
+        finally:
+            term.stop_reading()
+            stdout.close()
+            for fd in (input_read, input_write, output_read):
+                os.close(fd)
+    asyncio.run(main())
+
+def test_closed_input_stops_reading_and_wakes_waiters():
+    async def main():
+        input_read, input_write = os.pipe()
+        output_read, output_write = os.pipe()
+        stdout = os.fdopen(output_write, "w")
+        term = AsyncTerminalIO(stdout, asyncio.get_running_loop())
+        term.start_reading(input_read)
+        try:
+            os.write(input_write, b"a\x1b")
+            os.close(input_write)
+            events = await asyncio.wait_for(term.wait_for_events(), 1)
+            while len(events) < 2:
+                events += await asyncio.wait_for(term.wait_for_events(), 1)
+            assert [event.key_event for event in events] == ["a", "escape"]
+            assert term._input_fd is None
+            with pytest.raises(EOFError):
+                await asyncio.wait_for(term.wait_for_events(), 1)
+            assert [event async for event in term] == []
+        finally:
+            term.stop_reading()
+            stdout.close()
+            for fd in (input_read, output_read):
+                os.close(fd)
+    asyncio.run(main())
+
+def _read_until(fd: int, expected: bytes):
+    data = b""
+    while expected not in data:
+        data += os.read(fd, 1 << 16)
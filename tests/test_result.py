@@ -0,0 +1,104 @@
+from functui.classes import Result, Frame, Box, Rect, ComputedStyle, Coordinate, layout_to_result
+from functui.common import text, vbox, border
+from functui.nav import InteractionAreas, BoxData, interaction_area, ROOT_VERTICAL
+from functui.io.ansi import result_to_str
+
+
+def _frame():
+    return Frame(Box(10, 10), Rect(10, 10), ComputedStyle(), len)
+
+def test_child_results_are_referenced_and_flattened_in_order():
+    frame = _frame()
+    a = Result()
+    a.draw_pixel(frame, "a", Coordinate(0, 0))
+    b = Result()
+    b.draw_pixel(frame, "b", Coordinate(1, 0))
+    inner = Result()
+    inner.add_children_after([a, b])
+    outer = Result()
+    outer.draw_pixel(frame, "o", Coordinate(2, 0))
+    outer.add_children_after([inner, a])
+    assert [c.pixel.char for c in outer.get_commands()] == ["o", "a", "b", "a"]
+    assert a.get_commands() == (a._draw_commands[0],)
+
+def test_merging_does_not_modify_children():
+    box_data = BoxData(Box(1, 1), Box(1, 1), False)
+    a = Result()
+    a.set_data(InteractionAreas({"a": box_data}))
+    b = Result()
+    b.set_data(InteractionAreas({"b": box_data}))
+    parent = Result()
+    parent.add_children_after([a, b])
+    assert set(parent.expect_data(InteractionAreas).areas) == {"a", "b"}
+    assert set(a.expect_data(InteractionAreas).areas) == {"a"}
+
+def test_merged_data_is_copied_once_and_never_shared():
+    box_data = BoxData(Box(1, 1), Box(1, 1), False)
+    children = []
+    for key in "abcd":
+        child = Result()
+        child.set_data(InteractionAreas({key: box_data}))
+        children.append(child)
+    parent = Result()
+    parent.add_children_after(children[:3])
+    merged = parent.expect_data(InteractionAreas)
+    parent.add_children_after(children[3:])
+    assert parent.expect_data(InteractionAreas) is merged
+    assert set(merged.areas) == set("abcd")
+    assert [set(c.expect_data(InteractionAreas).areas) for c in children] == [{"a"}, {"b"}, {"c"}, {"d"}]
+    # a finished result that is merged into another is copied again
+    grandparent = Result()
+    grandparent.add_children_after([parent, children[0]])
+    assert set(merged.areas) == set("abcd")
+
+def test_layout_to_result_does_not_modify_cached_results():
+    layout = vbox([interaction_area(ROOT_VERTICAL.child(1))(text("x")), text("y")])
+    first = layout.render(_frame(), Box(10, 10))
+    layout_to_result(layout, Rect(10, 10), len)
+    assert layout.render(_frame(), Box(10, 10)) is first
+    assert len(first._data) == 1
+
+def test_offset_results_are_drawn_and_report_areas_in_place():
+    item_id = ROOT_VERTICAL.child(1)
+    layout = vbox([text("a"), interaction_area(item_id)(text("b")) | border], at_y=2)
+    res = layout_to_result(layout, Rect(10, 10), len)
+    assert res.expect_data(InteractionAreas).areas[item_id].actual_box == Box(8, 1, Coordinate(1, 4))
+    pixels = {c.at: c.text for c in res.iter_commands() if hasattr(c, "text")}
+    assert pixels == {Coordinate(0, 2): "a", Coordinate(1, 4): "b"}
+
+    moved = Result()
+    moved.draw_pixel(_frame(), "x", Coordinate(1, 1))
+    assert moved.offset_by(Coordinate(2, 3)).get_commands()[0].at == Coordinate(3, 4)
+
+def test_offset_data_is_moved_once_when_it_is_read():
+    moved_by = []
+    class _Counted(InteractionAreas):
+        def offset_by(self, coordinate):
+            moved_by.append(coordinate)
+            return _Counted(super().offset_by(coordinate).areas)
+    res = Result()
+    res.set_data(_Counted({"a": BoxData(Box(2, 2), Box(2, 2), False)}))
+    moved = res.offset_by(Coordinate(1, 0)).offset_by(Coordinate(0, 3), clip=Box(10, 4))
+    assert moved_by == []
+    area = moved.expect_data(_Counted).areas["a"]
+    assert (area.actual_box, area.visible_box) == (Box(2, 2, Coordinate(1, 3)), Box(2, 1, Coordinate(1, 3)))
+    moved.try_data(_Counted)
+    assert moved_by == [Coordinate(1, 0), Coordinate(0, 3)]
+
+def test_deferred_clipping_draws_the_same_as_clipping_while_rendering():
+    item_id = ROOT_VERTICAL.child(1)
+    for at_y in range(-3, 2):
+        layout = vbox([interaction_area(item_id)(text("a日b\nc")) | border, text("end")], at_y=at_y)
+        eager = layout_to_result(layout, Rect(6, 3))
+        deferred = layout_to_result(layout, Rect(6, 3), defer_clipping=True)
+        assert result_to_str(deferred) == result_to_str(eager)
+        assert deferred.expect_data(InteractionAreas).areas[item_id].visible_box \
+            == eager.expect_data(InteractionAreas).areas[item_id].visible_box
+
+def test_clipped_string_lines_keep_whole_characters():
+    res = Result()
+    res.draw_string_line(Frame(Box(10, 1), Rect(10, 1), ComputedStyle(), len), "abcdef")
+    line = res.get_commands()[0]
+    clipped = line.clipped_to(Box(3, 1, Coordinate(2, 0)))
+    assert (clipped.text, clipped.at) == ("cde", Coordinate(2, 0))
+    assert line.clipped_to(Box(3, 1, Coordinate(2, 1))) is None
@@ -0,0 +1,54 @@
+from functui.classes import Screen, Pixel, Coordinate, CharType, ComputedStyle, Color4, DrawBox, DrawPixel, DrawStringLine, Box
+import pytest
+
+
+def test_set_and_get():
+    screen = Screen(4, 3)
+    pixel = Pixel("x", style=ComputedStyle(fg=Color4.RED))
+    screen.set(Coordinate(3, 2), pixel)
+    assert screen.get(Coordinate(3, 2)) == pixel
+    assert screen.get(Coordinate(0, 0)) == Pixel()
+
+def test_set_out_of_range():
+    with pytest.raises(IndexError):
+        Screen(4, 3).set(Coordinate(4, 0), Pixel("x"))
+
+def test_split_by_lines():
+    screen = Screen(2, 2)
+    screen.set(Coordinate(1, 0), Pixel("a"))
+    assert [[p.char for p in line] for line in screen.split_by_lines()] == [[" ", "a"], [" ", " "]]
+
+def test_draw_box_is_clipped_to_screen():
+    screen = Screen(4, 3)
+    screen.apply_draw_commands(len, [DrawBox(Pixel("#"), Box(10, 2, Coordinate(2, -1)))])
+    assert ["".join(p.char for p in line) for line in screen.split_by_lines()] == ["  ##", "    ", "    "]
+
+def test_draw_string_line_and_pixel():
+    screen = Screen(5, 2)
+    style = ComputedStyle(bg=Color4.BLUE)
+    screen.apply_draw_commands(len, [
+        DrawStringLine("aお", style.id, 3, Coordinate(3, 1), b"\x00\x01"),
+        DrawPixel(Pixel("z"), Coordinate(0, 0)),
+    ])
+    assert screen.get(Coordinate(0, 0)).char == "z"
+    assert screen.get(Coordinate(3, 1)) == Pixel("a", style=style)
+    assert screen.get(Coordinate(4, 1)) == Pixel("お", CharType.WIDE_HEAD, style)
+
+def test_clear():
+    screen = Screen(2, 2)
+    screen.set(Coordinate(1, 1), Pixel("a", style=ComputedStyle(fg=Color4.RED)))
+    screen.clear()
+    assert screen.get(Coordinate(1, 1)) == Pixel()
+
+def test_draw_string_line_is_clipped_to_screen():
+    screen = Screen(4, 1)
+    screen.apply_draw_commands(len, [
+        DrawStringLine("abcdef", 0, 6, Coordinate(-1, 0)),
+    ])
+    assert "".join(p.char for p in screen.split_by_lines()[0]) == "bcde"
+    screen.apply_draw_commands(len, [
+        DrawStringLine("お日", 0, 4, Coordinate(1, 0), b"\x01\x01"),
+    ])
+    assert [p.char_type for p in screen.split_by_lines()[0]] == [
+        CharType.NORMAL, CharType.WIDE_HEAD, CharType.WIDE_TAIL, CharType.WIDE_HEAD
+    ]
@@ -0,0 +1,34 @@
+from functui import classes
+from functui.classes import ComputedStyle, StyleRule, StyleAttr, Color4, rgb, intern_style, style_by_id, apply_rule_to_style_id, rule_bold
+
+
+def test_equal_styles_share_an_id():
+    a = ComputedStyle(fg=rgb(1, 2, 3), attrs=StyleAttr.BOLD)
+    b = ComputedStyle(fg=rgb(1, 2, 3), attrs=StyleAttr.BOLD)
+    assert a is not b
+    assert a.id == b.id == intern_style(a)
+    assert hash(a) == hash(b)
+    assert style_by_id(a.id) == a
+
+def test_default_style_is_zero():
+    assert ComputedStyle().id == 0
+
+def test_apply_rule_to_style_id():
+    style = ComputedStyle(fg=Color4.RED)
+    new_id = apply_rule_to_style_id(style.id, rule_bold)
+    assert style_by_id(new_id) == ComputedStyle(fg=Color4.RED, attrs=StyleAttr.BOLD)
+    assert apply_rule_to_style_id(style.id, rule_bold) == new_id
+    assert style.apply_rule(rule_bold) is style_by_id(new_id)
+
+def test_apply_rule_removes_attrs():
+    style = ComputedStyle(attrs=StyleAttr.BOLD | StyleAttr.ITALIC)
+    assert style.apply_rule(StyleRule(remove_attrs=StyleAttr.BOLD, bg=Color4.BLUE))\
+        == ComputedStyle(bg=Color4.BLUE, attrs=StyleAttr.ITALIC)
+
+def test_rule_transitions_are_bounded(monkeypatch):
+    monkeypatch.setattr(classes, "RULE_TRANSITIONS_MAX_SIZE", 8)
+    style = ComputedStyle(fg=Color4.GREEN)
+    for i in range(20):
+        assert style_by_id(apply_rule_to_style_id(style.id, StyleRule(bg=rgb(i, 0, 0)))).bg == rgb(i, 0, 0)
+    assert len(classes._rule_transitions) <= 8
+    assert (style.id, StyleRule(bg=rgb(19, 0, 0))) in classes._rule_transitions
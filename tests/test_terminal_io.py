@@ -0,0 +1,254 @@
+import os
+import signal
+import threading
+from time import perf_counter
+from io import StringIO
+from queue import SimpleQueue
+from types import SimpleNamespace
+
+from functui.classes import Coordinate, Rect, InputEvent, layout_to_result
+from functui.common import text, border
+from functui.io import raw
+from functui.io.raw import TerminalIO, FrameTimings, FrameTiming, FrameWriter, InputDecoder, RenderScheduler, UnixTerminalIO, _create_reader_thread
+from functui.nav import NavAction, NavState
+
+
+class _StringTerminalIO(TerminalIO):
+    def get_terminal_size(self) -> Rect:
+        return Rect(10, 3)
+    def write(self, ansi_data: str):
+        self.stdout.write(ansi_data)
+
+
+def test_display_result_records_timings_when_enabled():
+    term = _StringTerminalIO(SimpleQueue(), StringIO())
+    term.display_result(layout_to_result(text("a") | border, Rect(10, 3)))
+    assert term.timings is None
+
+    seen = []
+    term.enable_timing(maxlen=2, callback=seen.append)
+    for content in ("a", "b", "c"):
+        term.display_result(layout_to_result(text(content) | border, Rect(10, 3)))
+    assert len(term.timings) == 2
+    assert seen[-1] is term.timings.last
+    assert all(t >= 0 for t in seen[-1])
+    assert seen[-1].layout > 0
+    assert "c" in term.stdout.getvalue()
+
+def test_frame_timing_percentiles():
+    timings = FrameTimings()
+    assert timings.p95() == 0
+    for ms in (5, 1, 3, 2, 4):
+        timings.append(FrameTiming(0, 0, 0, 0, ms))
+    assert (timings.p50(), timings.p95("flush"), timings.p99("write")) == (3, 5, 0)
+
+def test_first_frame_uses_absolute_moves_and_can_be_synchronized():
+    term = _StringTerminalIO(SimpleQueue(), StringIO())
+    term.synchronized_output = True
+    term.display_result(layout_to_result(text("a"), Rect(10, 3)))
+    out = term.stdout.getvalue()
+    assert "\n" not in out
+    assert out.startswith("\x1b[?2026h\x1b[1;1Ha")
+    assert out.endswith("\x1b[?2026l")
+
+def test_frame_writer_writes_partially_without_blocking():
+    read_fd, write_fd = os.pipe()
+    try:
+        writer = FrameWriter(write_fd, buffer_size=16)
+        frame = "x" * 300_000 # more than a pipe holds
+        writer.write(frame)
+        assert not writer.flush()
+        assert 0 < writer.pending < len(frame)
+        received = bytearray()
+        while not writer.flush():
+            received += os.read(read_fd, 1 << 16)
+        writer.write("end")
+        assert writer.flush()
+        while len(received) < len(frame) + 3:
+            received += os.read(read_fd, 1 << 16)
+        assert received == (frame + "end").encode()
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+def test_frame_writer_drops_frames_that_were_not_started():
+    read_fd, write_fd = os.pipe()
+    try:
+        writer = FrameWriter(write_fd, buffer_size=16)
+        writer.write_frame("x" * 300_000)
+        assert not writer.flush()
+        assert not writer.drop_unstarted_frame() # partially written
+        while not writer.flush():
+            os.read(read_fd, 1 << 16)
+        writer.write_frame("old")
+        assert writer.drop_unstarted_frame()
+        assert writer.pending == 0
+        writer.write_frame("old")
+        writer.write("other")
+        assert not writer.drop_unstarted_frame()
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+def test_frame_writer_drops_a_frame_that_grew_a_partly_written_buffer():
+    read_fd, write_fd = os.pipe()
+    try:
+        writer = FrameWriter(write_fd, buffer_size=16)
+        writer.write_frame("x" * 300_000)
+        assert not writer.flush() # the pipe is full, the rest stays pending
+        pending = writer.pending
+        writer.write_frame("y" * 300_000) # moves the pending bytes to the front and grows
+        assert writer.drop_unstarted_frame()
+        assert writer.pending == pending
+        received = bytearray()
+        while not writer.flush():
+            received += os.read(read_fd, 1 << 16)
+        while len(received) < 300_000:
+            received += os.read(read_fd, 1 << 16)
+        assert received == b"x" * 300_000
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+class _StalledTerminalIO(_StringTerminalIO):
+    """Keeps the output of the last frame pending until :meth:`drain` is called."""
+    queued: str | None = None
+    def write_frame(self, ansi_data: str):
+        self.drain()
+        self.queued = ansi_data
+    def drop_unstarted_frame(self) -> bool:
+        dropped = self.queued is not None
+        self.queued = None
+        return dropped
+    def has_pending_output(self) -> bool:
+        return self.queued is not None
+    def drain(self):
+        if self.queued is not None:
+            self.write(self.queued)
+            self.queued = None
+
+def test_display_result_replaces_frames_the_terminal_did_not_receive():
+    results = [layout_to_result(text(content) | border, Rect(10, 3)) for content in ("a", "b", "c")]
+    term = _StalledTerminalIO(SimpleQueue(), StringIO())
+    term.display_result(results[0])
+    term.drain()
+    term.display_result(results[1])
+    term.display_result(results[2]) # "b" was never written, diff against "a"
+    term.drain()
+
+    expected = _StringTerminalIO(SimpleQueue(), StringIO())
+    expected.display_result(results[0])
+    expected.display_result(results[2])
+    assert term.stdout.getvalue() == expected.stdout.getvalue()
+
+    term.display_result(results[0])
+    term.force_redraw()
+    term.display_result(results[1]) # still redraws everything after discarding "a"
+    term.drain()
+    fresh = _StringTerminalIO(SimpleQueue(), StringIO())
+    fresh.display_result(results[1])
+    assert term.stdout.getvalue().endswith(fresh.stdout.getvalue())
+
+def test_scheduler_returns_all_pending_events_at_once():
+    term = _StringTerminalIO(SimpleQueue(), StringIO())
+    for key in "abc":
+        term.event_queue.put(InputEvent(key_event=key))
+    events = RenderScheduler(term).wait_for_events()
+    assert [event.key_event for event in events] == ["a", "b", "c"]
+    assert term.event_queue.empty()
+
+def _put_mouse_burst(term: TerminalIO):
+    for x in range(5):
+        term.event_queue.put(InputEvent(mouse_position_event=Coordinate(x, 0)))
+    term.event_queue.put(InputEvent("left mouse", Coordinate(4, 0)))
+    for _ in range(4):
+        term.event_queue.put(InputEvent("mouse wheel down", Coordinate(4, 1), scroll_delta=1))
+    term.event_queue.put(InputEvent("mouse wheel up", Coordinate(4, 1), scroll_delta=-1))
+    term.event_queue.put(InputEvent(mouse_position_event=Coordinate(5, 1)))
+
+def test_block_until_input_merges_motion_but_keeps_every_wheel_event():
+    term = _StringTerminalIO(SimpleQueue(), StringIO())
+    _put_mouse_burst(term)
+    events = [term.block_until_input() for _ in range(8)]
+    assert events == [
+        InputEvent(mouse_position_event=Coordinate(4, 0)),
+        InputEvent("left mouse", Coordinate(4, 0)),
+        *[InputEvent("mouse wheel down", Coordinate(4, 1), scroll_delta=1)] * 4,
+        InputEvent("mouse wheel up", Coordinate(4, 1), scroll_delta=-1),
+        InputEvent(mouse_position_event=Coordinate(5, 1)),
+    ]
+    assert term.event_queue.empty()
+
+def test_scheduler_merges_motion_and_wheel_events_in_order():
+    term = _StringTerminalIO(SimpleQueue(), StringIO())
+    _put_mouse_burst(term)
+    assert RenderScheduler(term).wait_for_events() == [
+        InputEvent(mouse_position_event=Coordinate(4, 0)),
+        InputEvent("left mouse", Coordinate(4, 0)),
+        InputEvent("mouse wheel down", Coordinate(4, 1), scroll_delta=4),
+        InputEvent("mouse wheel up", Coordinate(4, 1), scroll_delta=-1),
+        InputEvent(mouse_position_event=Coordinate(5, 1)),
+    ]
+
+def test_wheel_delta_scales_scrolling():
+    wheel = InputDecoder().feed_bytes(b"\x1b[<65;3;4M")[0]
+    assert wheel.scroll_delta == 1
+    nav = NavState().update(action=NavAction.SCROLL_DOWN, scroll_delta=wheel.scroll_delta * 4)
+    assert nav.get_scrolling_difference() == 12
+    assert NavState().update(action=NavAction.SCROLL_UP).get_scrolling_difference() == -3
+
+def test_scheduler_folds_events_within_a_frame_interval():
+    term = _StringTerminalIO(SimpleQueue(), StringIO())
+    scheduler = RenderScheduler(term, max_fps=10)
+    term.event_queue.put(InputEvent(key_event="a"))
+    start = perf_counter()
+    assert len(scheduler.wait_for_events()) == 1
+    assert perf_counter() - start < 0.05 # idle, so no waiting
+
+    term.event_queue.put(InputEvent(key_event="b"))
+    threading.Timer(0.02, term.event_queue.put, [InputEvent(key_event="c")]).start()
+    assert [event.key_event for event in scheduler.wait_for_events()] == ["b", "c"]
+
+def test_reader_thread_reads_pastes_in_bulk():
+    read_fd, write_fd = os.pipe()
+    stdin = SimpleNamespace(buffer=os.fdopen(read_fd, "rb"))
+    queue = SimpleQueue()
+    _create_reader_thread(stdin, queue).start()
+    pasted = "x" * 100_000
+    os.write(write_fd, b"a\x1b[200~" + pasted.encode() + b"\x1b[201~b")
+    os.close(write_fd)
+    events = [queue.get(timeout=5) for _ in range(3)]
+    assert [event.key_event for event in events] == ["a", f"[{pasted}]", "b"]
+
+def test_input_decoder_continues_sequences_across_chunks():
+    decoder = InputDecoder()
+    assert decoder.feed_bytes(b"\x1b[") == []
+    assert [event.key_event for event in decoder.feed_bytes(b"Aa")] == ["up", "a"]
+
+def test_reader_thread_sends_a_lone_escape_after_a_delay():
+    read_fd, write_fd = os.pipe()
+    stdin = SimpleNamespace(buffer=os.fdopen(read_fd, "rb"))
+    queue = SimpleQueue()
+    _create_reader_thread(stdin, queue).start()
+    os.write(write_fd, b"\x1b")
+    assert queue.get(timeout=5).key_event == "escape"
+    os.write(write_fd, b"\x1b[B")
+    assert queue.get(timeout=5).key_event == "down"
+    os.close(write_fd)
+
+def test_resize_signals_are_debounced_into_one_event(monkeypatch):
+    size = Rect(80, 24)
+    monkeypatch.setattr(raw, "_read_terminal_size", lambda: size)
+    with open(os.devnull, "w") as stdout:
+        term = UnixTerminalIO(SimpleQueue(), stdout)
+        term.watch_resize()
+        try:
+            size = Rect(100, 30)
+            for _ in range(5):
+                os.kill(os.getpid(), signal.SIGWINCH)
+            assert term.event_queue.get(timeout=5) == InputEvent(resize_event=Rect(100, 30))
+            assert term.get_terminal_size() == Rect(100, 30)
+            threading.Event().wait(raw.RESIZE_DEBOUNCE * 2)
+            assert term.event_queue.empty()
+        finally:
+            term.stop_watching_resize()
@@ -0,0 +1,29 @@
+from functui.text_width import text_width, prefix_widths, char_width
+from functui.classes import Result, Frame, Box, Rect, ComputedStyle, Coordinate, Screen, CharType
+from wcwidth import wcswidth
+
+
+def test_text_width_matches_wcswidth():
+    for s in ["", "hello", "a\tb", "日本語", "é", "👍🏽", "\x1b"]:
+        assert text_width(s) == wcswidth(s)
+    assert char_width("日") == 2
+
+def test_prefix_widths():
+    assert list(prefix_widths("abc")) == [0, 1, 2, 3]
+    assert list(prefix_widths("a日b")) == [0, 1, 3, 4]
+    assert list(prefix_widths("a\x1bb")) == [0, 1, 1, 2]
+    assert list(prefix_widths("a日b", len)) == [0, 1, 2, 3]
+
+def _draw(content: str, at_x: int, view_box: Box):
+    res = Result()
+    res.draw_string_line(Frame(view_box, Rect(10, 1), ComputedStyle(), text_width), content, Coordinate(at_x, 0))
+    screen = Screen(10, 1)
+    screen.apply_draw_commands(text_width, res.iter_commands())
+    return "".join(p.char if p.char_type != CharType.WIDE_TAIL else "" for p in screen.split_by_lines()[0])
+
+def test_draw_string_line_clips_to_view_box():
+    assert _draw("hello", 0, Box(10, 1)) == "hello     "
+    assert _draw("hello", 0, Box(3, 1, Coordinate(2, 0))) == "  llo     "
+    assert _draw("hello", 4, Box(3, 1, Coordinate(2, 0))) == "    h     "
+    # wide characters are never cut in half
+    assert _draw("日本語", 0, Box(4, 1, Coordinate(1, 0))) == "  本      "
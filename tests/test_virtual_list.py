@@ -0,0 +1,27 @@
+from functui import Rect, layout_to_str, layout_to_result
+from functui.common import text, hbox
+from functui.nav import virtual_list, v_scroll, NavState, InteractionAreas, ROOT_VERTICAL
+
+
+def test_only_visible_items_are_built():
+    built = []
+    def build_item(i):
+        built.append(i)
+        return text(str(i))
+    layout = virtual_list(100_000, lambda i: 1 + i % 2, build_item)
+    assert layout_to_str(layout | v_scroll(ROOT_VERTICAL.child(1), NavState()), Rect(6, 3)) == "0     \n1     \n      "
+    assert built == [0, 1, 2]
+
+def test_active_item_always_has_an_area():
+    container = ROOT_VERTICAL.child(1)
+    nav = NavState(_active_id=container.child(500))
+    layout = virtual_list(1000, 1, lambda i: text(str(i)), container, nav)
+    areas = layout_to_result(layout, Rect(5, 5)).expect_data(InteractionAreas).areas
+    assert list(areas) == [container.child(i) for i in (0, 1, 2, 3, 4, 5, 499, 500, 501)]
+    assert areas[container.child(500)].actual_box.position.y == 500
+
+def test_min_width_is_given_not_measured():
+    layout = virtual_list(3, 1, lambda i: text(f"item {i}"))
+    assert layout.min_size(len, Rect(20, 5)) == Rect(0, 3)
+    wide = virtual_list(3, 1, lambda i: text(f"item {i}"), min_width=6)
+    assert layout_to_str(hbox([wide, text("|")]), Rect(8, 2)) == "item 0| \nitem 1  "
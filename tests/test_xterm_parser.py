@@ -0,0 +1,49 @@
+from functui.io._xterm_parser import ByteParser, RawInputEvent, RawInputType
+
+
+def _feed_chunks(parser: ByteParser, data: bytes, chunk_size: int) -> list[RawInputEvent]:
+    events = []
+    for i in range(0, len(data), chunk_size):
+        events.extend(parser.feed_bytes(data[i:i + chunk_size]))
+    return events
+
+def _joined(events: list[RawInputEvent]) -> list[tuple[str, RawInputType]]:
+    out = []
+    for event in events:
+        if out and event.type == RawInputType.CHAR and out[-1][1] == RawInputType.CHAR:
+            out[-1] = (out[-1][0] + event.data, RawInputType.CHAR)
+        else:
+            out.append((event.data, event.type))
+    return out
+
+def test_splits_text_from_sequences():
+    events = ByteParser().feed_bytes("hé 日\x1b[<35;10;20M\x1bOA\x1b]11;rgb:0/0/0\x07\r\x7f".encode())
+    assert [(event.data, event.type) for event in events] == [
+        ("hé 日", RawInputType.CHAR),
+        ("\x1b[<35;10;20M", RawInputType.CSI),
+        ("\x1bOA", RawInputType.SS3),
+        ("\x1b]11;rgb:0/0/0\x07", RawInputType.OSC),
+        ("\r", RawInputType.C0),
+        ("\x7f", RawInputType.DEL),
+    ]
+
+def test_sequences_and_characters_can_span_chunks():
+    data = "a😀\x1b[1;5C\x1bOP\x1b]11;x\x1b\\b\x1b[200~日\x1b[201~\x1b\x1b[A".encode()
+    expected = _joined(ByteParser().feed_bytes(data))
+    for chunk_size in range(1, len(data)):
+        assert _joined(_feed_chunks(ByteParser(), data, chunk_size)) == expected
+
+def test_escape_is_pending_until_flushed_or_followed():
+    parser = ByteParser()
+    assert parser.feed_bytes(b"a\x1b") == [RawInputEvent("a", RawInputType.CHAR)]
+    assert parser.pending
+    assert parser.flush() == [RawInputEvent("\x1b", RawInputType.ESC)]
+    assert not parser.pending
+    assert parser.feed_bytes(b"\x1b") == []
+    assert parser.feed_bytes(b"x") == [RawInputEvent("\x1b", RawInputType.ESC), RawInputEvent("x", RawInputType.CHAR)]
+
+def test_parsers_do_not_share_state():
+    first, second = ByteParser(), ByteParser()
+    assert first.feed_bytes(b"\x1b[") == []
+    assert second.feed_bytes(b"A") == [RawInputEvent("A", RawInputType.CHAR)]
+    assert first.feed_bytes(b"A") == [RawInputEvent("\x1b[A", RawInputType.CSI)]